@@ -11,31 +11,58 @@
 """
 
 from __future__ import annotations
-from typing import Any, Dict, List, Text, Optional, Tuple, Iterable
+from typing import Any, Dict, List, NamedTuple, Text, Optional, Tuple, Iterable
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.events import SlotSet, EventType
 import os
 import re
 import sqlite3
-import datetime
+import string
+import threading
+import time
+import unicodedata
+from functools import lru_cache
 import httpx
-from bs4 import BeautifulSoup
-from difflib import get_close_matches
+from rapidfuzz import fuzz, process
 
 # ΡΥΘΜΙΣΕΙΣ / CONFIGURATION
 
 # path αρχείου SQLite DB (το παιρνουμε από env var, αλλιώς default)
 DB_PATH = os.getenv("SQLITE_PATH", "./db/huahelper.db")
 
+# Διάρκεια (δευτερόλεπτα) της in-process cache για αναγνώσεις από τη DB (professors, facilities)
+DB_CACHE_TTL = 60
+
 # Σελίδα προπτυχιακών
 DIT_UNDERGRAD_URL = "https://dit.hua.gr/index.php/el/studies/undergraduate-studies"
 
+# Διάρκεια (δευτερόλεπτα) που κρατάμε στη μνήμη το HTML εξωτερικών σελίδων
+PAGE_CACHE_TTL = 300
+
+# Μία σύνδεση SQLite ανά thread, ανοίγει lazily και επαναχρησιμοποιείται
+_tls = threading.local()
+
 # Συνδεση στο SQLite.
-def db_conn():
-    return sqlite3.connect(DB_PATH)
+# - WAL/synchronous=NORMAL ώστε οι αναγνώσεις να μη μπλοκάρουν από εγγραφές (ratings)
+# - row_factory=sqlite3.Row: πρόσβαση και με όνομα στήλης (row["email"]) αλλά και σαν tuple
+# - isolation_level=None (autocommit), οι εγγραφές τυλίγονται σε `with con:`
+def db_conn() -> sqlite3.Connection:
+    con = getattr(_tls, "con", None)
+    if con is None:
+        con = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+        con.row_factory = sqlite3.Row
+        con.executescript(
+            "PRAGMA journal_mode=WAL;"
+            "PRAGMA synchronous=NORMAL;"
+            "PRAGMA temp_store=MEMORY;"
+            "PRAGMA cache_size=-20000;"
+        )
+        _tls.con = con
+    return con
 
 # Δημιοργια του payload "Facebook Generic Template" για το carousel
+# (ο μοναδικός τόπος που χτίζεται το envelope, νέο dict σε κάθε κλήση ώστε να μη μοιράζονται elements)
 def _fb_generic(elements: List[Dict[str, Any]]) -> Dict[str, Any]:
     return {
         "attachment": {
@@ -47,42 +74,41 @@ def _fb_generic(elements: List[Dict[str, Any]]) -> Dict[str, Any]:
         }
     }
 
-#    Μετατρέπει εγγραφή καθηγητή (row από DB) σε στοιχείο (element) του template.
-#    row = (email, f, l, gender, office, phone, category, area, page, image)
+#    Μετατρέπει καθηγητή (ProfRow, βλ. παρακάτω) σε στοιχείο (element) του template.
 #    - Τίτλος: Ονοματεπώνυμο (+ κατηγορία σε παρένθεση εφοσον υπάρχει)
 #    - Υπότιτλος: email/τηλέφωνο/γραφείο
-#    - Κουμπιά: Άνοιγμα σελίδας (αν υπάρχει), mailto: (αν υπάρχει email)
+#    - Κουμπιά: Άνοιγμα σελίδας (αν υπάρχει), mailto: (αν υπάρχει email) και,
+#      με details=True (carousel πολλαπλών αποτελεσμάτων), 'Λεπτομέρειες' (postback intent με email)
 #   - default_action: άνοιγμα της σελίδας όταν γίνει tap στην κάρτα (αν υπάρχει)
-def _prof_to_fb_element(row) -> Dict[str, Any]:
+def _prof_to_fb_element(row: "ProfRow", details: bool = False) -> Dict[str, Any]:
     email, f, l, _g, office, phone, category, _area, page, image = row
-    title = f"{(f or '').strip()} {(l or '').strip()}".strip() or (email or "")
+    title = row.name or email
     if category:
         title = f"{title} ({category})"
 
     # URL για tap στην κάρτα
-    default_url = page if (page and page != "Δεν υποστηρίζεται") else None
+    default_url = page if row.has_page else None
 
     buttons: List[Dict[str, str]] = []
     if default_url:
         buttons.append({"type": "web_url", "title": "Άνοιγμα", "url": default_url})
     if email:
         buttons.append({"type": "web_url", "title": "Email", "url": f"mailto:{email}"})
+        if details:
+            buttons.append({
+                "type": "postback",
+                "title": "Λεπτομέρειες",
+                "payload": f'/ask_professor_info{{"email":"{email}"}}'
+            })
 
     # Υπότιτλος: bullets (μέχρι 80 χαρακτήρες)
-    subtitle_bits = []
-    if email:
-        subtitle_bits.append(f"Email: {email}")
-    if phone:
-        subtitle_bits.append(f"Τηλ: {phone}")
-    if office:
-        subtitle_bits.append(f"Γραφ.: {office}")
-    subtitle = " • ".join(subtitle_bits)[:80]
+    subtitle = _prof_subtitle(email, phone, office)
 
     el: Dict[str, Any] = {
         "title": title,
         "subtitle": subtitle,
-        "image_url": (image or "").strip(),
-        "buttons": buttons[:3], 
+        "image_url": image,
+        "buttons": buttons[:3],
     }
     if default_url:
         el["default_action"] = {
@@ -92,32 +118,6 @@ def _prof_to_fb_element(row) -> Dict[str, Any]:
         }
     return el
 
-# Αποστέλλει (α) σύντομο text fallback με έως 3 γραμμές και carousel (έως 10 κάρτες).
-# Είναι χρήσιμο όταν υπάρχουν πολλαπλά αποτελέσματα.
-def _send_prof_carousel(dispatcher: CollectingDispatcher, rows: List[tuple]) -> None:
-
-    #Text fallback, ώστε να φαινονται δεδομενα ακομα και χωρις carousel
-    lines = []
-    for r in rows[:3]:
-        email, f, l, _g, office, phone, category, area, page, image = r
-        name = f"{(f or '').strip()} {(l or '').strip()}".strip()
-        bits = []
-        if email:
-            bits.append(f"Email: {email}")
-        if phone:
-            bits.append(f"Τηλ: {phone}")
-        if office:
-            bits.append(f"Γραφείο: {office}")
-        if page and page != "Δεν υποστηρίζεται":
-            bits.append(page)
-        lines.append(f"{name}{f' ({category})' if category else ''}\n" + " | ".join(bits))
-    if lines:
-        dispatcher.utter_message(text="Αποτελέσματα:\n• " + "\n• ".join(lines))
-
-    #Το carousel
-    elements = [_prof_to_fb_element(r) for r in rows[:10]]
-    dispatcher.utter_message(custom={"facebook": _fb_generic(elements)})
-
 # UTILITIES / ΓΕΝΙΚΑ
 
 #    Κανονικοποιεί κωδικούς μαθημάτων:
@@ -150,12 +150,24 @@ REPLACEMENTS = {
     "Ά": "α", "Ί": "ι", "Ϊ": "ι", "Ώ": "ω", "Ϋ": "υ", "Ύ": "υ", "Έ": "ε", "Ό": "ο", "Ή": "η",
 }
 
+# Πίνακας μετάφρασης για str.translate (όλα τα κλειδιά είναι μεμονωμένοι χαρακτήρες)
+_GREEK_TRANS = str.maketrans({ord(k): v for k, v in REPLACEMENTS.items()})
+_ACCENTED = frozenset(REPLACEMENTS)
+# Διακριτικά που δεν καλύπτει ο πίνακας: συνδυαστικοί τόνοι (NFD), πολυτονικά, λατινικά με τόνους
+_OTHER_DIACRITICS_RE = re.compile("[\u00c0-\u024f\u0300-\u036f\u1e00-\u1fff]")
+
 #    Επιστρέφει πεζοποιημένο κείμενο σε ελληνικούς χαρακτήρες.
 #    Π.χ. "Βαρλάμης" -> "βαρλαμης"
+#    Γρήγορος δρόμος: ASCII ή κείμενο χωρίς τονισμένους χαρακτήρες κάνει μόνο lower().
 def normalize_greek(text: str) -> str:
     t = text or ""
-    for src, dst in REPLACEMENTS.items():
-        t = t.replace(src, dst)
+    if t.isascii():
+        return t.lower()
+    if not _ACCENTED.isdisjoint(t):
+        t = t.translate(_GREEK_TRANS)
+    # Fallback: NFD + αφαίρεση συνδυαστικών σημείων για ό,τι δεν είναι στο REPLACEMENTS
+    if _OTHER_DIACRITICS_RE.search(t):
+        t = "".join(c for c in unicodedata.normalize("NFD", t) if not unicodedata.combining(c))
     return t.lower()
 
 #    Ενώνει μη κενά/μη None strings με διαχωριστικό `sep` και
@@ -183,183 +195,313 @@ def _db_all_professors_full() -> List[
         ).fetchall()
 
 
-def _display_name(f: Optional[str], l: Optional[str]) -> str:
-    """Συνθέτει το πλήηρες ονοματεπώνυμο από f_name/l_name."""
-    return f"{(f or '').strip()} {(l or '').strip()}".strip()
+def _cache_bucket() -> int:
+    """Χρονικό «κουβαδάκι» για TTL invalidation των lru_cache (αλλάζει κάθε DB_CACHE_TTL)."""
+    return int(time.monotonic() // DB_CACHE_TTL)
+
+
+@lru_cache(maxsize=32)
+def _cached_rows(sql: str, bucket: int) -> Tuple[sqlite3.Row, ...]:
+    """
+    Αποτέλεσμα read-only SELECT χωρίς παραμέτρους (λίστες υπηρεσιών, πλατφορμών κτλπ),
+    cached ανά `bucket` αφού τα δεδομένα αλλάζουν μόνο όταν ξανατρέξει ο scraper.
+    """
+    with db_conn() as con:
+        return tuple(con.execute(sql).fetchall())
+
+
+class ProfRow(NamedTuple):
+    """
+    Εγγραφή καθηγητή όπως φορτώνεται στην cache: τα string πεδία είναι ήδη
+    strip-αρισμένα και "" αντί για NULL, ώστε το rendering να μη τα ξαναελέγχει.
+    """
+    email: str
+    f_name: str
+    l_name: str
+    gender: Optional[str]
+    office: str
+    phone: str
+    category: Optional[str]
+    area_of: Optional[str]
+    page: str
+    image_url: str
+
+    @classmethod
+    def from_db(cls, row: Iterable[Optional[str]]) -> "ProfRow":
+        email, f, l, gender, office, phone, category, area, page, image = row
+        return cls(
+            (email or "").strip(), (f or "").strip(), (l or "").strip(), gender,
+            (office or "").strip(), (phone or "").strip(), category, area,
+            (page or "").strip(), (image or "").strip(),
+        )
+
+    @property
+    def name(self) -> str:
+        """Πλήρες ονοματεπώνυμο."""
+        return f"{self.f_name} {self.l_name}".strip()
+
+    @property
+    def has_page(self) -> bool:
+        """Υπάρχει πραγματική ακαδημαϊκή σελίδα (όχι κενή/«Δεν υποστηρίζεται»)."""
+        return bool(self.page) and self.page != "Δεν υποστηρίζεται"
+
+
+class _ProfIndex(NamedTuple):
+    """
+    Προϋπολογισμένα ευρετήρια ονομάτων καθηγητών σε μορφή παράλληλων λιστών:
+    rows[i], first_names[i], last_names[i], full_names[i] αφορούν τον ίδιο καθηγητή.
+    Τα maps δίνουν κανονικοποιημένο όνομα -> θέσεις i.
+    """
+    rows: List[ProfRow]
+    first_names: List[str]
+    last_names: List[str]
+    full_names: List[str]
+    first_map: Dict[str, List[int]]
+    last_map: Dict[str, List[int]]
+    full_map: Dict[str, List[int]]
+    fts: Optional[sqlite3.Connection]
 
 
-def _ranked_matches(query_text: str) -> List[Tuple]:
+def _build_prof_fts(first_names: List[str], last_names: List[str]) -> Optional[sqlite3.Connection]:
+    """
+    Χτίζει in-memory FTS5 πίνακα (prof_fts) πάνω στα κανονικοποιημένα ονόματα,
+    με rowid = θέση της εγγραφής στο _ProfIndex.rows.
+    Επιστρέφει None αν η SQLite δεν υποστηρίζει FTS5.
     """
-    Κατατάσσει καθηγητές ως προς το ερώτημα.
+    con = sqlite3.connect(":memory:", check_same_thread=False)
+    try:
+        con.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS prof_fts USING fts5("
+            "f_name, l_name, tokenize=\"unicode61 remove_diacritics 2\")"
+        )
+    except sqlite3.OperationalError:
+        con.close()
+        return None
+    con.executemany(
+        "INSERT INTO prof_fts(rowid, f_name, l_name) VALUES(?,?,?)",
+        zip(range(len(first_names)), first_names, last_names),
+    )
+    return con
+
+
+# Λέξεις κειμένου (π.χ. για FTS MATCH ή τακτικά αριθμητικά εξαμήνων)
+_WORD_RE = re.compile(r"\w+")
+
+# Λέξεις του ερωτήματος για το FTS MATCH (prefix μόνο από 4 χαρακτήρες και πάνω,
+# ώστε π.χ. το «για» να μη φέρνει όλους τους «Γιάννηδες»)
+def _fts_query(q: str) -> str:
+    """Μετατρέπει κανονικοποιημένο ερώτημα σε FTS5 MATCH έκφραση (OR ανά λέξη)."""
+    terms = []
+    for tok in _WORD_RE.findall(q):
+        terms.append(f'"{tok}"*' if len(tok) >= 4 else f'"{tok}"')
+    return " OR ".join(terms)
+
+
+@lru_cache(maxsize=1)
+def _cached_professors(bucket: int) -> _ProfIndex:
+    """
+    Φορτώνει μία φορά ανά `bucket` τον πίνακα professors και χτίζει
+    τα κανονικοποιημένα ονόματα και τα maps για το _ranked_matches_cached.
+    """
+    rows = [ProfRow.from_db(r) for r in _db_all_professors_full()]
+    idx = _ProfIndex(rows, [], [], [], {}, {}, {}, None)
+    for i, r in enumerate(rows):
+        nf, nl, nfull = normalize_greek(r.f_name), normalize_greek(r.l_name), normalize_greek(r.name)
+        idx.first_names.append(nf)
+        idx.last_names.append(nl)
+        idx.full_names.append(nfull)
+        idx.first_map.setdefault(nf, []).append(i)
+        idx.last_map.setdefault(nl, []).append(i)
+        idx.full_map.setdefault(nfull, []).append(i)
+    return idx._replace(fts=_build_prof_fts(idx.first_names, idx.last_names))
+
+
+@lru_cache(maxsize=256)
+def _prof_by_email(email: str, bucket: int) -> Optional[ProfRow]:
+    """Ανάκτηση καθηγητή με βάση το email, χωρίς διάκριση πεζών/κεφαλαίων (cached ανά `bucket`)."""
+    with db_conn() as con:
+        row = con.execute(
+            "SELECT email, f_name, l_name, gender, office, phone, "
+            "category, area_of, academic_web_page, image_url "
+            "FROM professors WHERE email = ? COLLATE NOCASE",
+            (email,),
+        ).fetchone()
+    return ProfRow.from_db(row) if row else None
+
+
+def _substring_hits(q: str, first_names: List[str], last_names: List[str], full_names: List[str]) -> List[int]:
+    """
+    Θέσεις i όπου το όνομα/επώνυμο/πλήρες περιέχεται στο `q` ή το `q` περιέχεται σε αυτά.
+    Δουλεύει μόνο με απλές λίστες από str και επιστρέφει ακέραιους, ώστε να τρέχει
+    αυτούσια και σε PyPy (χωρίς closures/ProfRow μέσα στο hot loop).
+    """
+    hits: List[int] = []
+    for i in range(len(full_names)):
+        nf, nl, nfull = first_names[i], last_names[i], full_names[i]
+        if (nl and nl in q) or (nf and nf in q) or (nfull and nfull in q) or (q in nl) or (q in nf) or (q in nfull):
+            hits.append(i)
+    return hits
+
+
+def _ranked_matches_norm(q_norm: str) -> List[ProfRow]:
+    """
+    Κατατάσσει καθηγητές ως προς το ήδη κανονικοποιημένο ερώτημα (βλ. _ranked_matches_cached).
+    Το αποτέλεσμα κρατιέται σε cache ανά `bucket`, οπότε επαναλαμβανόμενα ερωτήματα
+    (π.χ. Email -> Γραφείο -> Τηλέφωνο) δεν ξαναϋπολογίζονται.
+    """
+    if not q_norm:
+        return []
+    return list(_ranked_matches_cached(q_norm, _cache_bucket()))
+
+
+@lru_cache(maxsize=512)
+def _ranked_matches_cached(q: str, bucket: int) -> Tuple[ProfRow, ...]:
+    """
+    Κατατάσσει καθηγητές ως προς το (κανονικοποιημένο) ερώτημα `q`.
     Σειρά προτεραιότητας:
       1) ακριβές ταίριασμα στο επώνυμο αρχικά
       2) ακριβές ταίριασμα στο όνομα
       3) ακριβές ταίριασμα στο πλήρες ονοματεπώνυμο
-      4) υποσυμβολοσειρά (σε όνομα/επώνυμο/πλήρες)
-      5) fuzzy ταίριασμα (get_close_matches) δλδ το κοντινότερο δυνατό αποτέλεσμα σε αυτό που έγραψε ο χρήστης
+      4) FTS5 ταίριασμα λέξεων/προθεμάτων (prof_fts)
+      5) μόνο αν το 4 δεν έφερε τίποτα: υποσυμβολοσειρά (σε όνομα/επώνυμο/πλήρες)
+      6) fuzzy ταίριασμα (rapidfuzz) δλδ το κοντινότερο δυνατό αποτέλεσμα σε αυτό που έγραψε ο χρήστης,
+         μόνο αν δεν υπάρχει ακριβές ταίριασμα (1-3) ούτε υποσυμβολοσειρά για ερώτημα >= 4 χαρακτήρων
 
-    Επιστρέφει ordered unique λίστα (μοναδικοποίηση βάση email).
+    Επιστρέφει ordered unique tuple (μοναδικοποίηση βάση email).
     """
-    q = normalize_greek((query_text or "").strip())
-    if not q:
-        return []
+    idx = _cached_professors(bucket)
+
+    # Η κατάταξη γίνεται πάνω σε θέσεις (i) και τα ProfRow υλοποιούνται μόνο στο τέλος.
+    # Ακριβή ταιριάσματα απευθείας από τα maps (χωρίς σάρωση)
+    exact_last = idx.last_map.get(q, [])
+    exact_first = idx.first_map.get(q, [])
+    exact_full = idx.full_map.get(q, [])
+    sub_hits: List[int] = []
+    fuzzy_hits: List[int] = []
+
+    # Αναζήτηση λέξεων/προθεμάτων στο FTS5 ευρετήριο (rowid == θέση)
+    match = _fts_query(q) if idx.fts is not None else ""
+    if match:
+        sub_hits = [
+            i
+            for (i,) in idx.fts.execute(
+                "SELECT rowid FROM prof_fts WHERE prof_fts MATCH ? ORDER BY rank", (match,)
+            )
+        ]
+
+    if not sub_hits:
+        # Σάρωση για υποσυμβολοσειρές (τα διπλότυπα φεύγουν στη σύνθεση παρακάτω)
+        sub_hits = _substring_hits(q, idx.first_names, idx.last_names, idx.full_names)
+
+    # Fuzzy ταιριάσματα (π.χ. απο ορθογραφικά), μόνο αν δεν υπάρχει ακριβές ταίριασμα
+    # ή αρκετά μεγάλο ερώτημα που ήδη βρήκε υποσυμβολοσειρά
+    has_exact = bool(exact_last or exact_first or exact_full)
+    if not has_exact and not (sub_hits and len(q) >= 4):
+        for names in (idx.full_names, idx.last_names, idx.first_names):
+            for _cand, _score, i in process.extract(q, names, scorer=fuzz.ratio, score_cutoff=85, limit=5):
+                fuzzy_hits.append(i)
 
-    rows = _db_all_professors_full()
-
-    def norm_parts(row):
-        _, f, l, *_ = row
-        nf, nl = normalize_greek(f or ""), normalize_greek(l or "")
-        return nf, nl, normalize_greek(_display_name(f, l))
-
-    exact_last, exact_first, exact_full, sub_hits, fuzzy_hits = [], [], [], [], []
-
-    full_names_norm, full_map = [], {}
-    last_names_norm, last_map = [], {}
-    first_names_norm, first_map = [], {}
-
-    # Σάρωση όλων των εγγραφών και ταξινόμηση σε buckets
-    for r in rows:
-        nf, nl, nfull = norm_parts(r)
-        full_names_norm.append(nfull)
-        full_map.setdefault(nfull, []).append(r)
-        last_names_norm.append(nl)
-        last_map.setdefault(nl, []).append(r)
-        first_names_norm.append(nf)
-        first_map.setdefault(nf, []).append(r)
-
-        if nl and q == nl:
-            exact_last.append(r)
-        elif nf and q == nf:
-            exact_first.append(r)
-        elif nfull and q == nfull:
-            exact_full.append(r)
-        elif (nl and nl in q) or (nf and nf in q) or (nfull and nfull in q) or (q in nl) or (q in nf) or (q in nfull):
-            sub_hits.append(r)
-
-    # Fuzzy ταιριάσματα (π.χ. απο ορθογραφικά)
-    for cand in get_close_matches(q, full_names_norm, n=5, cutoff=0.85):
-        fuzzy_hits.extend(full_map.get(cand, []))
-    for cand in get_close_matches(q, last_names_norm, n=5, cutoff=0.85):
-        fuzzy_hits.extend(last_map.get(cand, []))
-    for cand in get_close_matches(q, first_names_norm, n=5, cutoff=0.85):
-        fuzzy_hits.extend(first_map.get(cand, []))
-
-    # Σύνθεση μοναδικής λίστας με τη σειρά των buckets
-    seen, ordered = set(), []
-    for bucket in (exact_last, exact_first, exact_full, sub_hits, fuzzy_hits):
-        for r in bucket:
-            # email ως μοναδικό κλειδί
-            key = (r[0] or "").lower()
-            if key not in seen:
-                seen.add(key)
-                ordered.append(r)
-    return ordered
-
-def _resolve_prof_from_slot_or_text(tracker: Tracker) -> List[Tuple]:
+    # Σύνθεση μοναδικής λίστας με τη σειρά των ομάδων
+    # (dict ως ordered set θέσεων· το email είναι PRIMARY KEY, άρα μία θέση ανά καθηγητή)
+    ordered: Dict[int, None] = {}
+    for hits in (exact_last, exact_first, exact_full, sub_hits, fuzzy_hits):
+        for i in hits:
+            ordered.setdefault(i)
+    return tuple(idx.rows[i] for i in ordered)
+
+
+def _resolve_prof_from_slot_or_text(tracker: Tracker) -> List[ProfRow]:
     """
     Προσπαθεί πρώτα από το slot 'professor_name'. Αν αποτύχει/λείπει,
     πάμε στο raw κείμενο του χρήστη (latest_message['text']).
 
-    Επιστρέφει ταξινομημένη λίστα εγγραφών DB (tuples) όπως κάνααμε στο _ranked_matches().
+    Επιστρέφει ταξινομημένη λίστα εγγραφών (ProfRow) όπως κάνααμε στο _ranked_matches_norm().
     """
-    slot_q = tracker.get_slot("professor_name")
-    if slot_q:
-        m = _ranked_matches(slot_q)
-        if m:
+    slot_norm = normalize_greek((tracker.get_slot("professor_name") or "").strip())
+    raw_norm = normalize_greek((tracker.latest_message.get("text") or "").strip())
+
+    if slot_norm:
+        m = _ranked_matches_norm(slot_norm)
+        # Αν το raw κείμενο είναι ίδιο με το slot, δεν έχει νόημα δεύτερη αναζήτηση
+        if m or raw_norm == slot_norm:
             return m
-    raw = (tracker.latest_message.get("text") or "").strip()
-    return _ranked_matches(raw) if raw else []
+    return _ranked_matches_norm(raw_norm)
 
 def _prof_subtitle(email: Optional[str], phone: Optional[str], office: Optional[str]) -> str:
     """Δημιουργεί σύντομο υπότιτλο με email/τηλέφωνο/γραφείο (έως 80 χαρακτήρες)."""
-    bits = []
-    if email:
-        bits.append(f"Email: {email}")
-    if phone:
-        bits.append(f"Τηλ: {phone}")
-    if office:
-        bits.append(f"Γραφείο: {office}")
-    return " • ".join(bits)[:80]
-
-def _prof_to_carousel_element(row) -> Dict[str, Any]:
-    """
-    Μετατρέπει καθηγητή (row) σε στοιχείο genericc arousel:
-    - 'Περισσότερα' (link στη σελίδα)
-    - 'Email' (mailto:)
-    - 'Λεπτομέρειες' (postback intent με email)
-    """
-    email, f, l, _g, office, phone, category, _area, page, image = row
-    title = _display_name(f, l) or (email or "")
-    if category:
-        title = f"{title} ({category})"
-    buttons: List[Dict[str, str]] = []
-    if page and page != "Δεν υποστηρίζεται":
-        buttons.append({"type": "web_url", "title": "Περισσότερα", "url": page})
-    if email:
-        buttons.append({"type": "web_url", "title": "Email", "url": f"mailto:{email}"})
-        buttons.append({
-            "type": "postback",
-            "title": "Λεπτομέρειες",
-            "payload": f'/ask_professor_info{{"email":"{email}"}}'
-        })
-    return carousel_element(
-        title=title,
-        subtitle=_prof_subtitle(email, phone, office),
-        buttons=buttons,
-        image_url=image or None,
-    )
-
-def _send_prof_carousel(dispatcher: CollectingDispatcher, rows: List[tuple]) -> None:
+    return " • ".join(
+        s for s in (
+            f"Email: {email}" if email else None,
+            f"Τηλ: {phone}" if phone else None,
+            f"Γραφείο: {office}" if office else None,
+        ) if s
+    )[:80]
+
+def _send_prof_carousel(dispatcher: CollectingDispatcher, rows: List[ProfRow]) -> None:
     """
     Στέλνει μικτό αποτέλεσμα: (α) text fallback + (β) JSON payload για Generic Template.
     Χρήσιμο όταν υπάρχουν πολλαπλά ταίρια καθηγητών.
     """
-    elements = [_prof_to_carousel_element(r) for r in rows[:10]]
+    elements = [_prof_to_fb_element(r, details=True) for r in rows[:10]]
 
     # 1) Plain-text fallback για να υπάρχει ορατότητα και σε text-only clients πχ στο testing που κανουμε rasa shell
     lines = []
     for r in rows[:3]:
-        email, f, l, _g, office, phone, category, area, page, image = r
-        title = f"{(f or '').strip()} {(l or '').strip()}".strip()
-        bits = []
-        if email:
-            bits.append(f"Email: {email}")
-        if phone:
-            bits.append(f"Τηλ: {phone}")
-        if office:
-            bits.append(f"Γραφείο: {office}")
-        if page and page != "Δεν υποστηρίζεται":
-            bits.append(page)
-        lines.append(f"{title}{f' ({category})' if category else ''}\n" + " | ".join(bits))
+        bits = " | ".join(
+            b for b in (
+                f"Email: {r.email}" if r.email else None,
+                f"Τηλ: {r.phone}" if r.phone else None,
+                f"Γραφείο: {r.office}" if r.office else None,
+                r.page if r.has_page else None,
+            ) if b
+        )
+        lines.append(f"{r.name}{f' ({r.category})' if r.category else ''}\n" + bits)
     if lines:
         dispatcher.utter_message(text="Αποτελέσματα:\n• " + "\n• ".join(lines))
 
     # 2) Facebook Generic Template (json_message)
-    dispatcher.utter_message(
-        json_message={
-            "attachment": {
-                "type": "template",
-                "payload": {
-                    "template_type": "generic",
-                    "elements": elements
-                }
-            }
-        }
-    )
+    dispatcher.utter_message(json_message=_fb_generic(elements))
 
 # Εξαγωγή κωδικού μαθήματος από κείμενο
-# Regex: 1-3 γράμματα (λατινικά ή ελληνικά) + προαιρετικό κενό + 1-3 ψηφία
-CODE_RE = re.compile(r"(?i)\b([A-Za-zΑ-Ωα-ω]{1,3}\s?\d{1,3})\b")
+# Μοτίβο: λέξη με 1-3 γράμματα (λατινικά ή ελληνικά) + προαιρετικό κενό + 1-3 ψηφία
+# (ισοδύναμο με το regex r"(?i)\b([A-Za-zΑ-Ωα-ω]{1,3}\s?\d{1,3})\b", χωρίς regex engine)
+_CODE_LETTERS = frozenset(
+    string.ascii_letters
+    + "ΑΒΓΔΕΖΗΘΙΚΛΜΝΞΟΠΡΣΤΥΦΧΨΩ"
+    + "αβγδεζηθικλμνξοπρσςτυφχψω"
+)
+_CODE_DIGITS = frozenset(string.digits)
+
+def _is_word_char(c: str) -> bool:
+    """Αντίστοιχο του word character του re: αλφαριθμητικός χαρακτήρας ή underscore."""
+    return c.isalnum() or c == "_"
 
 def _extract_course_code(text: str) -> Optional[str]:
     """
     Προσπαθεί να εντοπίσει κωδικό μαθήματος μέσα στο κείμενο.
     Αν βρεθεί, τον κανονικοποιεί (μέσω normalize_code) και τον επιστρέφει.
+    Σαρώνει το κείμενο μία φορά, λέξη προς λέξη.
     """
-    m = CODE_RE.search(text or "")
-    if not m:
-        return None
-    return normalize_code(m.group(1))
+    t = text or ""
+    n = len(t)
+    i = 0
+    while i < n:
+        if t[i] not in _CODE_LETTERS or (i and _is_word_char(t[i - 1])):
+            i += 1
+            continue
+        # Τρέχουσα σειρά γραμμάτων στην αρχή λέξης
+        j = i
+        while j < n and t[j] in _CODE_LETTERS:
+            j += 1
+        if j - i <= 3:
+            k = j + 1 if j < n and t[j].isspace() else j
+            d = k
+            while d < n and t[d] in _CODE_DIGITS:
+                d += 1
+            if 1 <= d - k <= 3 and (d == n or not _is_word_char(t[d])):
+                return normalize_code(t[i:d])
+        i = j
+    return None
 
 # Default fallback / Γενική απάντηση
 class ActionDefaultFallback(Action):
@@ -397,6 +539,7 @@ def _format_professor_message(
     """
     Δημιουργεί ανθρώπινο κείμενο με τα στοιχεία καθηγητή,
     με πρόθεμα(θα το πουμε polite) ανάλογα το φύλο (Ο/Η).
+    Το `page` δίνεται μόνο αν υπάρχει (ProfRow.has_page).
     """
     polite = "Ο/Η" if not gender else ("Ο" if gender == "M" else "Η")
     parts: List[str] = []
@@ -414,7 +557,7 @@ def _format_professor_message(
         details.append(f"Email: {email}")
     if phone:
         details.append(f"Τηλ: {phone}")
-    if page and page != "Δεν υποστηρίζεται":
+    if page:
         details.append(f"Ιστοσελίδα: {page}")
 
     return safe_join([msg] + details)
@@ -437,20 +580,23 @@ class ActionGetProfessorInfo(Action):
             return [SlotSet("professor_name", None)]
 
         if len(matches) == 1:
-            e, f, l, g, office, phone, category, area, page, image = matches[0]
+            row = matches[0]
+            e, f, l, g, office, phone, category, area, page, _image = row
 
             # 1) Κάρτα με εικόνα (tap ανοίγει URL εφόσον υπάρχει)
-            element = _prof_to_fb_element(matches[0])
+            element = _prof_to_fb_element(row)
             dispatcher.utter_message(custom={"facebook": _fb_generic([element])})
 
             # 2) Αναλυτικές λεπτομέρειες σε κείμενο
-            txt = _format_professor_message(f, l, g, category, area, office, e, phone, page)
+            txt = _format_professor_message(
+                f, l, g, category, area, office, e, phone, page if row.has_page else None
+            )
             dispatcher.utter_message(text=txt)
         else:
             _send_prof_carousel(dispatcher, matches)
 
         # Θέτουμε slot 'email' για πιθανή μετέπειτα χρήση και καθαρίζουμε 'professor_name'
-        return [SlotSet("email", matches[0][0]), SlotSet("professor_name", None)]
+        return [SlotSet("email", matches[0].email), SlotSet("professor_name", None)]
 
 class ActionGetProfessorInfoFromEmail(Action):
     """
@@ -473,14 +619,7 @@ class ActionGetProfessorInfoFromEmail(Action):
             dispatcher.utter_message(text="Δεν έχω email για αναζήτηση.")
             return []
 
-        with db_conn() as con:
-            row = con.execute(
-                "SELECT email, f_name, l_name, gender, office, phone, "
-                "category, area_of, academic_web_page "
-                "FROM professors WHERE email = ?",
-                (email,),
-            ).fetchone()
-
+        row = _prof_by_email(email, _cache_bucket())
         if not row:
             dispatcher.utter_message(text="Δεν βρέθηκαν στοιχεία.")
             return []
@@ -495,10 +634,12 @@ class ActionGetProfessorInfoFromEmail(Action):
             category,
             area,
             page,
+            _image,
         ) = row
 
         msg = _format_professor_message(
-            f_name, l_name, gender, category, area, office, email, phone, page
+            f_name, l_name, gender, category, area, office, email, phone,
+            page if row.has_page else None,
         )
         dispatcher.utter_message(text=msg)
         return []
@@ -573,9 +714,8 @@ class ActionGetProfessorWebsite(Action):
             _send_prof_carousel(dispatcher, matches)
             return [SlotSet("professor_name", None)]
         row = matches[0]
-        email, f, l = row[0], row[1], row[2]
-        page = row[8]  # academic_web_page
-        if page and page != "Δεν υποστηρίζεται":
+        f, l, page = row.f_name, row.l_name, row.page
+        if row.has_page:
             dispatcher.utter_message(text=f"Ιστοσελίδα {f} {l}: {page}")
         else:
             dispatcher.utter_message(text=f"Δεν υπάρχει διαθέσιμη ιστοσελίδα για {f} {l}.")
@@ -589,14 +729,17 @@ class ActionListProfessors(Action):
         return "action_list_professors"
 
     def run(self, dispatcher, tracker, domain):
-        with db_conn() as con:
-            rows = con.execute(
-                "SELECT DISTINCT f_name, l_name, email FROM professors ORDER BY l_name ASC"
-            ).fetchall()
+        # Το ονοματεπώνυμο συντίθεται στη SQLite και το LIMIT 21 αρκεί
+        # για να ξέρουμε αν υπάρχουν περισσότεροι από 20
+        rows = _cached_rows(
+            "SELECT TRIM(COALESCE(f_name, '')) || ' ' || TRIM(COALESCE(l_name, '')) AS name "
+            "FROM professors ORDER BY l_name ASC LIMIT 21",
+            _cache_bucket(),
+        )
         if not rows:
             dispatcher.utter_message(text="Δεν υπάρχουν καταχωρημένοι καθηγητές στη βάση.")
             return []
-        names = [f"{(f or '').strip()} {(l or '').strip()}" for f, l, _ in rows][:20]
+        names = [name for (name,) in rows[:20]]
         extra_hint = "\n…γράψε «στοιχεία για τον <όνομα>» για περισσότερες πληροφορίες." if len(rows) > 20 else ""
         dispatcher.utter_message(text="Καθηγητές:\n• " + "\n• ".join(names) + extra_hint)
         return []
@@ -625,6 +768,60 @@ class ActionGetCoursesByProfessor(Action):
 
 
 # Υπηρεσίες/Facilities
+def _facility_fts(con: sqlite3.Connection, bucket: int) -> bool:
+    """
+    Χτίζει (μία φορά ανά σύνδεση και ανά `bucket` του _cache_bucket) temp FTS5 πίνακα fac_fts
+    με τα κανονικοποιημένα ονόματα των facilities (rowid = facilities.rowid), ώστε νέες εγγραφές
+    από το scraper να φαίνονται μέσα σε DB_CACHE_TTL. Η κανονικοποίηση γίνεται με
+    normalize_greek, γιατί ο unicode61 tokenizer δεν αφαιρεί τους ελληνικούς τόνους.
+    Επιστρέφει False αν δεν είναι διαθέσιμο το FTS5 ή ο πίνακας.
+    """
+    built = getattr(_tls, "fac_fts", None)
+    if built is not None and built[0] == bucket:
+        return built[1]
+    try:
+        con.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS temp.fac_fts "
+            "USING fts5(name_norm, tokenize='unicode61 remove_diacritics 2')"
+        )
+        con.execute("DELETE FROM temp.fac_fts")
+        rows = con.execute("SELECT rowid, name FROM facilities").fetchall()
+        con.executemany(
+            "INSERT INTO temp.fac_fts(rowid, name_norm) VALUES(?,?)",
+            ((rowid, normalize_greek(name)) for rowid, name in rows),
+        )
+        ready = True
+    except sqlite3.OperationalError:
+        ready = False
+    _tls.fac_fts = (bucket, ready)
+    return ready
+
+
+@lru_cache(maxsize=128)
+def _facility_lookup(fac: str, bucket: int) -> Optional[sqlite3.Row]:
+    """
+    Επιστρέφει όλες τις στήλες της πρώτης δομής που ταιριάζει στο `fac`
+    (cached ανά `bucket`, ώστε ωράριο/επικοινωνία/τοποθεσία να μοιράζονται ένα SELECT).
+    Πρώτα prefix αναζήτηση στο fac_fts (χωρίς τόνους/πεζά-κεφαλαία),
+    αλλιώς το παλιό `name LIKE '%fac%'`.
+    """
+    con = db_conn()
+    columns = "name, working_hours, url, email, phone, fax, location"
+    match = " ".join(f'"{tok}"*' for tok in _WORD_RE.findall(normalize_greek(fac)))
+    if match and _facility_fts(con, bucket):
+        row = con.execute(
+            f"SELECT {columns} FROM facilities "
+            "WHERE rowid IN (SELECT rowid FROM temp.fac_fts WHERE fac_fts MATCH ?)",
+            (match,),
+        ).fetchone()
+        if row:
+            return row
+    return con.execute(
+        f"SELECT {columns} FROM facilities WHERE name LIKE ?",
+        ("%"+fac+"%",),
+    ).fetchone()
+
+
 class ActionGetFacilityWorkingHours(Action):
     """Ανακτά ωράριο λειτουργίας δομής/υπηρεσίας (π.χ. Βιβλιοθήκη)."""
 
@@ -636,15 +833,11 @@ class ActionGetFacilityWorkingHours(Action):
         if not fac:
             dispatcher.utter_message(text="Για ποια υπηρεσία; (π.χ. Βιβλιοθήκη, Γραμματεία)")
             return []
-        with db_conn() as con:
-            row = con.execute(
-                "SELECT working_hours, url FROM facilities WHERE name LIKE ?",
-                ("%"+fac+"%",),
-            ).fetchone()
+        row = _facility_lookup(fac, _cache_bucket())
         if not row:
             dispatcher.utter_message(text="Δεν έχω ωράριο για αυτήν την υπηρεσία.")
             return []
-        hours, url = row
+        hours, url = row["working_hours"], row["url"]
         txt = hours or "Δεν δίνεται από τον ιστότοπο."
         if url:
             txt += f" (Περισσότερα: {url})"
@@ -660,15 +853,11 @@ class ActionGetFacilityContactInfo(Action):
 
     def run(self, dispatcher, tracker, domain):
         fac = tracker.get_slot("facility_name") or ""
-        with db_conn() as con:
-            row = con.execute(
-                "SELECT email, phone, fax, url FROM facilities WHERE name LIKE ?",
-                ("%"+fac+"%",),
-            ).fetchone()
+        row = _facility_lookup(fac, _cache_bucket())
         if not row:
             dispatcher.utter_message(text="Δεν βρήκα στοιχεία επικοινωνίας.")
             return []
-        email, phone, fax, url = row
+        email, phone, fax, url = row["email"], row["phone"], row["fax"], row["url"]
         email = email or "—"
         phone = phone or "—"
         fax   = fax or "—"
@@ -685,15 +874,11 @@ class ActionGetFacilityLocation(Action):
 
     def run(self, dispatcher, tracker, domain):
         fac = tracker.get_slot("facility_name") or ""
-        with db_conn() as con:
-            row = con.execute(
-                "SELECT location, url FROM facilities WHERE name LIKE ?",
-                ("%"+fac+"%",),
-            ).fetchone()
+        row = _facility_lookup(fac, _cache_bucket())
         if not row:
             dispatcher.utter_message(text="Δεν βρήκα τοποθεσία.")
             return []
-        location, url = row
+        location, url = row["location"], row["url"]
         txt = location or "Δεν δίνεται από τον ιστότοπο."
         if url:
             txt += f" (Περισσότερα: {url})"
@@ -711,10 +896,9 @@ class ActionListAllCourses(Action):
         return "action_list_all_courses"
 
     def run(self, dispatcher, tracker, domain):
-        with db_conn() as con:
-            rows = con.execute(
-                "SELECT course_code, course_name FROM courses ORDER BY course_code"
-            ).fetchall()
+        rows = _cached_rows(
+            "SELECT course_code, course_name FROM courses ORDER BY course_code", _cache_bucket()
+        )
         if not rows:
             dispatcher.utter_message(text="Δεν υπάρχουν μαθήματα στη βάση.")
             return []
@@ -723,10 +907,41 @@ class ActionListAllCourses(Action):
         return []
 
 
+# Αριθμός εξαμήνου (1-2 ψηφία) μέσα στο κείμενο
+_SEM_RE = re.compile(r"\d{1,2}")
+
+# Τακτικά αριθμητικά εξαμήνων (χωρίς τόνους, όπως τα δίνει η normalize_greek)
+_SEM_ORDINALS = {
+    "πρωτο": 1, "πρωτου": 1,
+    "δευτερο": 2, "δευτερου": 2,
+    "τριτο": 3, "τριτου": 3,
+    "τεταρτο": 4, "τεταρτου": 4,
+    "πεμπτο": 5, "πεμπτου": 5,
+    "εκτο": 6, "εκτου": 6,
+    "εβδομο": 7, "εβδομου": 7,
+    "ογδοο": 8, "ογδοου": 8,
+}
+
+
+def _extract_semester(text: str) -> Optional[int]:
+    """
+    Βρίσκει εξάμηνο στο κείμενο: πρώτα αριθμό (π.χ. «3ου»),
+    αλλιώς τακτικό αριθμητικό (π.χ. «τρίτου» -> 3).
+    """
+    m = _SEM_RE.search(text or "")
+    if m:
+        return int(m.group(0))
+    for w in _WORD_RE.findall(normalize_greek(text)):
+        sem = _SEM_ORDINALS.get(w)
+        if sem:
+            return sem
+    return None
+
+
 class ActionGetCoursesPerSemester(Action):
     """
     Λίστα μαθημάτων ανά εξάμηνο. Αναγνωρίζει το εξάμηνο είτε από slot 'semester'
-    είτε κάνει extract αριθμό από το ελεύθερο κείμενο.
+    είτε κάνει extract αριθμό/τακτικό αριθμητικό από το ελεύθερο κείμενο.
     Κάνει σύγκριση, ακόμη κι αν τα semesters είναι TEXT στη DB.
     """
 
@@ -737,15 +952,13 @@ class ActionGetCoursesPerSemester(Action):
         sem = tracker.get_slot("semester")
         if not sem:
             # Προσπάθεια εύρεσης αριθμού από το τελευταίο μήνυμα
-            raw = (tracker.latest_message.get("text") or "")
-            m = re.search(r"(\d{1,2})", raw)
-            if m:
-                sem = m.group(1)
+            sem = _extract_semester(tracker.latest_message.get("text") or "")
 
         try:
             sem_int = int(sem) if sem is not None else None
         except Exception:
-            sem_int = None
+            # π.χ. slot «τρίτο»
+            sem_int = _extract_semester(str(sem))
 
         if not sem_int:
             dispatcher.utter_message(
@@ -825,6 +1038,38 @@ class ActionGetCourseDetails(Action):
         return []
 
 
+# Κοινός async HTTP client (connection pool / keep-alive) για όλες τις εξωτερικές σελίδες.
+# Δημιουργείται lazily μέσα στο event loop του action server και κλείνει με το process.
+_HTTP: Optional[httpx.AsyncClient] = None
+
+def _client() -> httpx.AsyncClient:
+    global _HTTP
+    if _HTTP is None or _HTTP.is_closed:
+        _HTTP = httpx.AsyncClient(
+            timeout=20,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+        )
+    return _HTTP
+
+# Αφαίρεση HTML tags για απλή αναζήτηση στο κείμενο της σελίδας (χωρίς parser)
+_TAG_RE = re.compile(r"<[^>]+>")
+
+# url -> (χρονική στιγμή λήψης, κείμενο χωρίς tags σε casefold)
+_page_cache: Dict[str, Tuple[float, str]] = {}
+
+#    Επιστρέφει το κείμενο της σελίδας (χωρίς HTML tags, casefold) από την cache αν δεν έχει
+#    λήξει (PAGE_CACHE_TTL), αλλιώς το κατεβάζει και το επεξεργάζεται μία φορά ανά λήψη.
+async def _fetch_page_text(url: str) -> str:
+    hit = _page_cache.get(url)
+    if hit and time.monotonic() - hit[0] < PAGE_CACHE_TTL:
+        return hit[1]
+    r = await _client().get(url)
+    r.raise_for_status()
+    text = _TAG_RE.sub(" ", r.text).casefold()
+    _page_cache[url] = (time.monotonic(), text)
+    return text
+
+
 class ActionGetCourseInfo(Action):
     """
     Γρήγορος έλεγχος ύπαρξης κωδικού στη σελίδα προπτυχιακών
@@ -842,23 +1087,17 @@ class ActionGetCourseInfo(Action):
             dispatcher.utter_message(text="Δώσε κωδικό μαθήματος (π.χ. ΜΥ01).")
             return []
         try:
-            async with httpx.AsyncClient(timeout=20) as client:
-                r = await client.get(DIT_UNDERGRAD_URL)
-                r.raise_for_status()
-                soup = BeautifulSoup(r.text, "lxml")
-                # Αναζήτηση σε κείμενο (case-insensitive)
-                found = soup.find(
-                    string=lambda s: s and (code.upper() in s or code.lower() in s)
+            text = await _fetch_page_text(DIT_UNDERGRAD_URL)
+            # Αναζήτηση σε όλο το κείμενο της σελίδας (case-insensitive)
+            if code.casefold() in text:
+                dispatcher.utter_message(
+                    text=(f"Βρήκα αναφορά του {code.upper()} στη σελίδα προπτυχιακών: {DIT_UNDERGRAD_URL}")
+                )
+            else:
+                dispatcher.utter_message(
+                    text=("Δεν εντόπισα πληροφορίες από τη σελίδα. "
+                          "Δοκίμασε αναζήτηση στη βάση.")
                 )
-                if found:
-                    dispatcher.utter_message(
-                        text=(f"Βρήκα αναφορά του {code.upper()} στη σελίδα προπτυχιακών: {DIT_UNDERGRAD_URL}")
-                    )
-                else:
-                    dispatcher.utter_message(
-                        text=("Δεν εντόπισα πληροφορίες από τη σελίδα. "
-                              "Δοκίμασε αναζήτηση στη βάση.")
-                    )
         except Exception:
             # Αντικατάσταση συγκεκριμένων σφαλμάτων με γενικό μήνυμα για τον χρήστη
             dispatcher.utter_message(
@@ -876,20 +1115,36 @@ class ActionListStudentServices(Action):
         return "action_list_student_services"
 
     def run(self, dispatcher, tracker, domain):
-        with db_conn() as con:
-            rows = con.execute(
-                "SELECT name FROM student_services ORDER BY name"
-            ).fetchall()
+        rows = _cached_rows("SELECT name FROM student_services ORDER BY name LIMIT 30", _cache_bucket())
         if not rows:
             dispatcher.utter_message(text="Δεν υπάρχουν υπηρεσίες στη βάση.")
             return []
-        names = [r[0] for r in rows][:30]
-        dispatcher.utter_message(text="Υπηρεσίες:\n• " + "\n".join(names))
+        dispatcher.utter_message(text="Υπηρεσίες:\n• " + "\n".join(r[0] for r in rows))
         return []
 
 
+#    Πρώτη εγγραφή του `table` της οποίας το name περιέχει το `q`.
+#    Για q >= 3 χαρακτήρων ψάχνει στο trigram ευρετήριο `{table}_fts` (βλ. scripts/init_db.py),
+#    αλλιώς (ή σε παλιά βάση χωρίς ευρετήριο) πέφτει στο `name LIKE '%q%'`.
+def _lookup_by_name(con: sqlite3.Connection, table: str, columns: str, q: str) -> Optional[sqlite3.Row]:
+    if len(q) >= 3:
+        phrase = '"' + q.replace('"', '""') + '"'
+        try:
+            return con.execute(
+                f"SELECT {columns} FROM {table} "
+                f"WHERE rowid IN (SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH ? LIMIT 1)",
+                (phrase,),
+            ).fetchone()
+        except sqlite3.OperationalError:
+            pass
+    return con.execute(
+        f"SELECT {columns} FROM {table} WHERE name LIKE ?",
+        ("%"+q+"%",),
+    ).fetchone()
+
+
 class ActionGetStudentService(Action):
-    """Επιστρέφει πληροφορίες συγκεκριμένης φοιτητικής υπηρεσίας (LIKE)."""
+    """Επιστρέφει πληροφορίες συγκεκριμένης φοιτητικής υπηρεσίας (FTS/LIKE)."""
 
     def name(self) -> Text:
         return "action_get_student_service"
@@ -897,11 +1152,7 @@ class ActionGetStudentService(Action):
     def run(self, dispatcher, tracker, domain):
         q = tracker.get_slot("service_name") or ""
         with db_conn() as con:
-            row = con.execute(
-                "SELECT name, description, email, phone, url "
-                "FROM student_services WHERE name LIKE ?",
-                ("%"+q+"%",),
-            ).fetchone()
+            row = _lookup_by_name(con, "student_services", "name, description, email, phone, url", q)
         if not row:
             dispatcher.utter_message(text="Δεν βρήκα την υπηρεσία.")
             return []
@@ -924,20 +1175,18 @@ class ActionListEPlatforms(Action):
         return "action_list_eplatforms"
 
     def run(self, dispatcher, tracker, domain):
-        with db_conn() as con:
-            rows = con.execute(
-                "SELECT name, url FROM e_platforms ORDER BY name"
-            ).fetchall()
+        rows = _cached_rows("SELECT name, url FROM e_platforms ORDER BY name LIMIT 30", _cache_bucket())
         if not rows:
             dispatcher.utter_message(text="Δεν υπάρχουν πλατφόρμες.")
             return []
-        items = [f"{n} — {u or '—'}" for n, u in rows][:30]
-        dispatcher.utter_message(text="Ηλεκτρονικές πλατφόρμες:\n• " + "\n".join(items))
+        dispatcher.utter_message(
+            text="Ηλεκτρονικές πλατφόρμες:\n• " + "\n".join(f"{n} — {u or '—'}" for n, u in rows)
+        )
         return []
 
 
 class ActionGetEPlatform(Action):
-    """Επιστρέφει περιγραφή/συνδέσμους για συγκεκριμένη πλατφόρμα (LIKE)."""
+    """Επιστρέφει περιγραφή/συνδέσμους για συγκεκριμένη πλατφόρμα (FTS/LIKE)."""
 
     def name(self) -> Text:
         return "action_get_eplatform"
@@ -945,11 +1194,7 @@ class ActionGetEPlatform(Action):
     def run(self, dispatcher, tracker, domain):
         q = tracker.get_slot("platform_name") or ""
         with db_conn() as con:
-            row = con.execute(
-                "SELECT name, description, url, help_url "
-                "FROM e_platforms WHERE name LIKE ?",
-                ("%"+q+"%",),
-            ).fetchone()
+            row = _lookup_by_name(con, "e_platforms", "name, description, url, help_url", q)
         if not row:
             dispatcher.utter_message(text="Δεν βρήκα πλατφόρμα με αυτό το όνομα.")
             return []
@@ -972,24 +1217,43 @@ class ActionGetDepartmentContacts(Action):
         return "action_get_department_contacts"
 
     def run(self, dispatcher, tracker, domain):
-        with db_conn() as con:
-            rows = con.execute(
-                "SELECT key, label, value, url FROM contacts ORDER BY key"
-            ).fetchall()
+        rows = _cached_rows("SELECT key, label, value, url FROM contacts ORDER BY key", _cache_bucket())
         if not rows:
             dispatcher.utter_message(text="Δεν υπάρχουν στοιχεία επικοινωνίας.")
             return []
-        parts = []
-        for key, label, value, url in rows:
-            line = f"{(label or key)}: {(value or '—')}"
-            if url:
-                line += f" ({url})"
-            parts.append("• " + line)
-        dispatcher.utter_message(text="\n".join(parts))
+        dispatcher.utter_message(text="\n".join(
+            f"• {(label or key)}: {(value or '—')}" + (f" ({url})" if url else "")
+            for key, label, value, url in rows
+        ))
         return []
 
 
 # Tutorials (στατικό carousel)
+# Τα elements είναι σταθερά, χτίζονται μία φορά στο import
+_TUTORIAL_ELEMENTS = [
+    carousel_element(
+        "e-Class",
+        "Οδηγός & είσοδος",
+        buttons=[{"type": "web_url", "title": "Άνοιγμα", "url": "https://eclass.hua.gr"}],
+    ),
+    carousel_element(
+        "e-Studies",
+        "Φοιτητολόγιο",
+        buttons=[{"type": "web_url", "title": "Άνοιγμα", "url": "https://e-studies.hua.gr"}],
+    ),
+    carousel_element(
+        "Nextcloud",
+        "Cloud & συνεργασία",
+        buttons=[{"type": "web_url", "title": "Άνοιγμα", "url": "https://mycloud.ditapps.hua.gr"}],
+    ),
+    carousel_element(
+        "Rocket.Chat",
+        "Επικοινωνία",
+        buttons=[{"type": "web_url", "title": "Άνοιγμα", "url": "https://chat.ditapps.hua.gr"}],
+    ),
+]
+
+
 class ActionTutorialsList(Action):
     """
     Επιστρέφει ένα στατικό carousel με βασικές πλατφόρμες/συνδέσμους.
@@ -999,31 +1263,8 @@ class ActionTutorialsList(Action):
         return "action_tutorials_list"
 
     def run(self, dispatcher, tracker, domain):
-        elements = [
-            carousel_element(
-                "e-Class",
-                "Οδηγός & είσοδος",
-                buttons=[{"type": "web_url", "title": "Άνοιγμα", "url": "https://eclass.hua.gr"}],
-            ),
-            carousel_element(
-                "e-Studies",
-                "Φοιτητολόγιο",
-                buttons=[{"type": "web_url", "title": "Άνοιγμα", "url": "https://e-studies.hua.gr"}],
-            ),
-            carousel_element(
-                "Nextcloud",
-                "Cloud & συνεργασία",
-                buttons=[{"type": "web_url", "title": "Άνοιγμα", "url": "https://mycloud.ditapps.hua.gr"}],
-            ),
-            carousel_element(
-                "Rocket.Chat",
-                "Επικοινωνία",
-                buttons=[{"type": "web_url", "title": "Άνοιγμα", "url": "https://chat.ditapps.hua.gr"}],
-            ),
-        ]
-
         # Facebook custom payload
-        dispatcher.utter_message(custom={"facebook": {"type": "carousel", "elements": elements}})
+        dispatcher.utter_message(custom={"facebook": {"type": "carousel", "elements": _TUTORIAL_ELEMENTS}})
 
         # Σύντομο βοηθητικό μήνυμα
         dispatcher.utter_message(text="Χρήσιμες πλατφόρμες: e-Class, e-Studies, Nextcloud, Rocket.Chat")
@@ -1041,12 +1282,9 @@ class ActionGetErasmusApplicationInfo(Action):
         return "action_get_erasmus_application_info"
 
     def run(self, dispatcher, tracker, domain):
-        with db_conn() as con:
-            row = con.execute(
-                "SELECT email, phone FROM facilities WHERE name LIKE '%Erasmus%'"
-            ).fetchone()
+        row = _facility_lookup("Erasmus", _cache_bucket())
         if row:
-            dispatcher.utter_message(text=f"Erasmus: Email {row[0] or '—'}, Τηλ {row[1] or '—'}")
+            dispatcher.utter_message(text=f"Erasmus: Email {row['email'] or '—'}, Τηλ {row['phone'] or '—'}")
         else:
             dispatcher.utter_message(text="Δεν βρήκα γραφείο Erasmus.")
         return []
@@ -1067,15 +1305,12 @@ class RatingForm(Action):
         if rating not in {"excellent", "mediocre", "bad"}:
             dispatcher.utter_message(text="Παρακαλώ επίλεξε μια από τις διαθέσιμες αξιολογήσεις.")
             return []
+        # Το timestamp δίνεται ρητά (ίδια μορφή "%Y-%m-%d %H:%M:%S" από τη SQLite): παλιότερες βάσεις
+        # έχουν πίνακα ratings χωρίς DEFAULT, που το CREATE TABLE IF NOT EXISTS δεν αλλάζει
         with db_conn() as con:
             con.execute(
-                "INSERT INTO ratings(timestamp, user_id, rating) VALUES(?,?,?)",
-                (
-                    datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    tracker.sender_id,
-                    rating,
-                ),
+                "INSERT INTO ratings(timestamp, user_id, rating) VALUES(datetime('now', 'localtime'),?,?)",
+                (tracker.sender_id, rating),
             )
-            con.commit()
         dispatcher.utter_message(text="Ευχαριστώ για την αξιολόγηση! 🙏")
         return [SlotSet("rating", None)]
@@ -4,6 +4,7 @@
 """
 from __future__ import annotations
 from typing import Any, Dict, List
+import unicodedata
 
 from rasa.engine.graph import GraphComponent, ExecutionContext
 from rasa.engine.recipes.default_recipe import DefaultV1Recipe
@@ -13,17 +14,16 @@ from rasa.shared.nlu.constants import TEXT
 from rasa.shared.nlu.training_data.message import Message
 from rasa.shared.nlu.training_data.training_data import TrainingData
 
-# Αντιστοιχίσεις χαρακτήρων με διακριτικά (τονους κτλπ) σε χαρακτήρες χωρίς
-REPLACEMENTS = {
-    "ά": "α","ί": "ι","ϊ": "ι","ΐ": "ι","ώ": "ω","ΰ": "υ","ϋ": "υ","ύ": "υ","έ": "ε","ό": "ο","ή": "η",
-    "Ά": "α","Ί": "ι","Ϊ": "ι","Ώ": "ω","Ϋ": "υ","Ύ": "υ","Έ": "ε","Ό": "ο","Ή": "η",
-}
+# Συνδυαστικά διακριτικά (U+0300–U+036F: τόνος, διαλυτικά κτλπ) -> διαγραφή μέσω str.translate.
+# Μετά από NFD κάθε χαρακτήρας με τόνο γίνεται βάση + συνδυαστικό σημάδι,
+# οπότε καλύπτονται όλοι οι συνδυασμοί (και όσοι δεν ήταν στο παλιό REPLACEMENTS).
+_STRIP = dict.fromkeys(range(0x0300, 0x0370))
 
 def _normalize(text: str) -> str:
-    """Εφαρμόζει αντικαταστάσεις και κάνει lowercase."""
-    for k, v in REPLACEMENTS.items():
-        text = text.replace(k, v)
-    return text.lower()
+    """Αφαιρεί διακριτικά (NFD + strip) και κάνει lowercase."""
+    if text.isascii():
+        return text.lower()
+    return unicodedata.normalize("NFD", text).translate(_STRIP).lower()
 
 @DefaultV1Recipe.register(
     [DefaultV1Recipe.ComponentType.MESSAGE_FEATURIZER], is_trainable=False
@@ -7,7 +7,9 @@
   - facilities (με PRIMARY KEY: name)
 
 και συμπληρωματικούς:
-  - student_services, e_platforms, contacts
+  - student_services, e_platforms, contacts, ratings
+
+και FTS5 (trigram) ευρετήρια ονομάτων για student_services, e_platforms.
 
 Χρήση:
     python scripts/init_db.py [path/to/huahelper.db]
@@ -33,6 +35,7 @@ CREATE TABLE IF NOT EXISTS professors (
   academic_web_page TEXT,
   image_url TEXT
 );
+CREATE INDEX IF NOT EXISTS idx_professors_l_name ON professors(l_name);
 
 CREATE TABLE IF NOT EXISTS courses (
   course_code TEXT PRIMARY KEY,
@@ -78,16 +81,52 @@ CREATE TABLE IF NOT EXISTS contacts (
   value TEXT,
   url TEXT
 );
+-- Case-insensitive ευρετήρια ονομάτων (για `=`/prefix LIKE χωρίς πεζά-κεφαλαία)
+CREATE INDEX IF NOT EXISTS idx_services_name ON student_services(name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_eplatforms_name ON e_platforms(name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_facilities_name ON facilities(name COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS ratings (
+  timestamp TEXT DEFAULT (datetime('now', 'localtime')),
+  user_id TEXT,
+  rating TEXT
+);
+"""
+
+# FTS5 (trigram) ευρετήρια ονομάτων, ώστε η αναζήτηση υποσυμβολοσειράς να μη σκανάρει
+# όλο τον πίνακα όπως το `name LIKE '%q%'`. External content + triggers για συγχρονισμό.
+FTS_TABLES = ("student_services", "e_platforms")
+
+FTS_TEMPLATE = """
+CREATE VIRTUAL TABLE IF NOT EXISTS {t}_fts
+  USING fts5(name, content='{t}', content_rowid='rowid', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS {t}_ai AFTER INSERT ON {t} BEGIN
+  INSERT INTO {t}_fts(rowid, name) VALUES (new.rowid, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS {t}_ad AFTER DELETE ON {t} BEGIN
+  INSERT INTO {t}_fts({t}_fts, rowid, name) VALUES ('delete', old.rowid, old.name);
+END;
+CREATE TRIGGER IF NOT EXISTS {t}_au AFTER UPDATE ON {t} BEGIN
+  INSERT INTO {t}_fts({t}_fts, rowid, name) VALUES ('delete', old.rowid, old.name);
+  INSERT INTO {t}_fts(rowid, name) VALUES (new.rowid, new.name);
+END;
+-- Για βάσεις που είχαν ήδη γραμμές πριν υπάρξει το ευρετήριο
+INSERT INTO {t}_fts({t}_fts) VALUES ('rebuild');
 """
 
+FTS_SCHEMA = "".join(FTS_TEMPLATE.format(t=t) for t in FTS_TABLES)
+
 def ensure_db(path: str) -> None:
     """Δημιουργεί path, συνδέεται, εκτελεί τα σχήματα και κλείνει."""
     os.makedirs(os.path.dirname(path), exist_ok=True)
     con = sqlite3.connect(path)
     cur = con.cursor()
-    cur.executescript(CORE_SCHEMA)
-    cur.executescript(EXTRA_SCHEMA)
-    con.commit()
+    # WAL (μόνιμο στο αρχείο): ο scraper/τα ratings δεν μπλοκάρουν τις αναγνώσεις των actions
+    cur.executescript(
+        "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL; "
+        "PRAGMA cache_size=-20000; PRAGMA temp_store=MEMORY;"
+    )
+    # Όλο το σχήμα σε ένα transaction (ένα commit/fsync αντί για ένα ανά executescript)
+    cur.executescript("BEGIN;\n" + CORE_SCHEMA + EXTRA_SCHEMA + FTS_SCHEMA + "\nCOMMIT;")
     con.close()
 
 def main(args: list[str]) -> None:
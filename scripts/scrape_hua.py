@@ -4,19 +4,30 @@
 """
 
 from __future__ import annotations
+import asyncio
+import io
 import os
 import re
 import sqlite3
-from typing import Dict, List, Optional, Tuple, Iterable
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Iterable, Iterator
 from urllib.parse import urljoin, urldefrag
+from pathlib import Path
+import hishel
 import httpx
-from bs4 import BeautifulSoup
+from lxml import etree
+from lxml import html as lxml_html
+from lxml.html import HtmlElement
 
 # ΡΥΘΜΙΣΕΙΣ
 
 SQLITE_DB_PATH: str = os.getenv("SQLITE_PATH", "./db/huahelper.db")
 BASE_URL: str = "https://dit.hua.gr"
 
+# Φάκελος και διάρκεια (δευτερόλεπτα) της on-disk cache των HTTP απαντήσεων
+HTTP_CACHE_DIR: str = os.getenv("HTTP_CACHE_DIR", "./.cache/http")
+HTTP_CACHE_TTL: int = 86400
+
 # Τρέχουσες πηγές (URLs) σελίδων
 URL_FACULTY: str = f"{BASE_URL}/index.php/el/department-gr/faculty-members"
 URL_UNDERGRAD: str = f"{BASE_URL}/index.php/el/studies/undergraduate-studies"
@@ -25,11 +36,60 @@ URL_STUDENT_SERVICES: str = f"{BASE_URL}/index.php/el/department-gr/student-serv
 URL_EPLATFORMS: str = f"{BASE_URL}/index.php/el/department-gr/e-platforms-gr"
 URL_CONTACT: str = f"{BASE_URL}/index.php/el/department-gr/contact-access"
 
+# REGEX (precompiled μία φορά στο import)
+
+_SCHEME_RE = re.compile(r"^[a-zA-Z0-9+.-]+:.*")
+_EMAIL_SPACES_RE = re.compile(r"\s*([@.])\s*")
+# [at]/(at)/[dot]/(dot) σε οποιοδήποτε case (ένα πέρασμα αντί για τέσσερα)
+_EMAIL_OBFUSCATION_RE = re.compile(r"\[(at|dot)\]|\((at|dot)\)", re.I)
+_SLUG_RE = re.compile(r"[^\w]+")
+_UNDERSCORES_RE = re.compile(r"_+")
+# Το lookbehind απαγορεύει έναρξη στη μέση ενός local-part (όχι O(n²) retries σε μεγάλα runs
+# χωρίς @) και τα άνω όρια κρατούν γραμμικό το backtracking. Χωρίς possessive/atomic
+# groups, αφού αυτά θέλουν Python >= 3.11 (το Rasa 3.6 τρέχει σε <= 3.10).
+EMAIL_RE = re.compile(
+    r"(?<![A-Za-z0-9._%+-])[A-Za-z0-9._%+-]{1,64}\s*(?:\[at\]|@|\(at\))\s*"
+    r"[A-Za-z0-9.-]{1,64}\s*(?:\[dot\]|\.|\(dot\))\s*[A-Za-z]{2,24}",
+    re.I,
+)
+_PLAIN_EMAIL_RE = re.compile(r"^[^\s@]+@[^\s@]+\.[^\s@]+$")
+_PHONE_RE = re.compile(r"\+?\d[\d\s\-]{6,}\d")
+_DIGITS = frozenset("0123456789")
+_NUM_RE = re.compile(r"\d{1,2}")
+_SEP_RE = re.compile(r"[:：]")
+_OFFICE_RE = re.compile(r"γραφεί(?:ο|ο)\s*[:：]\s*([^,]+)", re.I)
+_MORE_INFO_RE = re.compile("Περισσότερες", re.I)
+_SITE_LINK_RE = re.compile(r"site|web|home", re.I)
+_HTTP_RE = re.compile(r"^https?://")
+_MAP_RE = re.compile(r"(google\.com/maps|openstreetmap|goo\.gl/maps)", re.I)
+
+# Μοτίβα «Label: Value» (η ετικέτα ακολουθείται από : και την τιμή ως το τέλος γραμμής)
+_LABEL_VALUE = r"\s*[:：]\s*([^\n]+)"
+_OFFICE_LABEL_RE = re.compile(r"γραφεί(?:ο|ο)|office" + _LABEL_VALUE, re.I)
+_AREA_LABEL_RE = re.compile(r"γνωστικ(?:ό|ο) αντικείμενο|research area|field" + _LABEL_VALUE, re.I)
+_ECTS_LABEL_RE = re.compile(r"ects|πιστωτικ" + _LABEL_VALUE, re.I)
+_TYPE_LABEL_RE = re.compile(r"τύπ|type|κατηγορ" + _LABEL_VALUE, re.I)
+_SEMESTER_LABEL_RE = re.compile(r"εξάμηνο|semester" + _LABEL_VALUE, re.I)
+# Ετικέτες που διαβάζονται από κάθε σελίδα μαθήματος (βλ. scan_labels)
+COURSE_LABELS = {"ects": _ECTS_LABEL_RE, "type": _TYPE_LABEL_RE, "sem": _SEMESTER_LABEL_RE}
+
+# XPath (compiled μία φορά): η αναζήτηση γίνεται ολόκληρη μέσα στο libxml2
+_ROW_DIVS_XPATH = etree.XPath("//div[contains(@class, 'row')]")
+_PADDED_DIVS_XPATH = etree.XPath("//div[contains(@style, 'padding')]")
+_ARTICLES_XPATH = etree.XPath("//article")
+
+# Tags τίτλων ενοτήτων ανά σελίδα και tags περιεχομένου κάτω από αυτούς (βλ. section_texts)
+_FACILITY_HEADERS = frozenset({"h2", "h3"})
+_SERVICE_HEADERS = frozenset({"h2", "h3", "h4"})
+_CONTACT_HEADERS = frozenset({"h4", "h5"})
+_BLOCK_TAGS = frozenset({"p", "div", "ul", "li"})
+
 # ΒΟΗΘΗΤΙΚΑ
 
 def collapse_ws(text: str | None) -> str:
     """Συμπύκνωση πολλαπλών whitespaces/νέων γραμμών σε ένα κενό."""
-    return re.sub(r"\s+", " ", (text or "").strip())
+    # str.split() χωρίζει σε κάθε run whitespace (ίδιο σύνολο με το \s) και πετά τα κενά άκρα
+    return " ".join((text or "").split())
 
 
 def absolutize(href: Optional[str]) -> Optional[str]:
@@ -41,9 +101,15 @@ def absolutize(href: Optional[str]) -> Optional[str]:
     """
     if not href:
         return None
+    return _absolutize(href)
+
+
+# τα ιδια hrefs επαναλαμβανονται πολλες φορες στις σελιδες, οποτε κραταμε cache
+@lru_cache(maxsize=4096)
+def _absolutize(href: str) -> str:
     # αφαιρουμε το fragment
     href = urldefrag(href)[0]  
-    if re.match(r"^[a-zA-Z0-9+.-]+:.*", href):
+    if _SCHEME_RE.match(href):
          # π.χ. mailto:, tel:, http:, https:
         return href 
     if href.startswith("/"):
@@ -51,14 +117,127 @@ def absolutize(href: Optional[str]) -> Optional[str]:
     return href
 
 
-def fetch_soup(client: httpx.Client, url: str) -> BeautifulSoup:
+# Ένας lxml HTMLParser ανά encoding (επαναχρησιμοποιείται σε όλες τις σελίδες)
+_HTML_PARSERS: Dict[str, lxml_html.HTMLParser] = {}
+
+
+def _html_parser(encoding: str) -> lxml_html.HTMLParser:
+    parser = _HTML_PARSERS.get(encoding)
+    if parser is None:
+        parser = _HTML_PARSERS[encoding] = lxml_html.HTMLParser(encoding=encoding)
+    return parser
+
+
+async def fetch_bytes(client: httpx.AsyncClient, url: str) -> Tuple[bytes, str]:
+    """Λήψη σελίδας ως (bytes, encoding). Το charset του header έχει προτεραιότητα, αλλιώς UTF-8."""
+    r = await client.get(url, timeout=30.0)
+    r.raise_for_status()
+    return r.content, r.charset_encoding or "utf-8"
+
+
+async def fetch_soup(client: httpx.AsyncClient, url: str) -> HtmlElement:
     """
-    Λήψη HTML σελίδας και parsing με BeautifulSoup (lxml parser).
-    Χρησιμοποιεί shared httpx.Client για επαναχρησιμοποίηση συνδέσεων.
+    Λήψη HTML σελίδας και parsing απευθείας με lxml.html (ρίζα: <html>).
+    Χρησιμοποιεί shared httpx.AsyncClient για επαναχρησιμοποίηση συνδέσεων.
+    Τα <script>/<style> αδειάζουν, ώστε το text_of() να δίνει μόνο ορατό κείμενο.
     """
-    r = client.get(url, timeout=30.0)
-    r.raise_for_status()
-    return BeautifulSoup(r.text, "lxml")
+    content, encoding = await fetch_bytes(client, url)
+    # Τα bytes πάνε απευθείας στο libxml2 (χωρίς ενδιάμεσο decode σε str).
+    # UTF-8 είναι αυτό που δηλώνουν οι σελίδες του dit.hua.gr.
+    tree = lxml_html.document_fromstring(content, parser=_html_parser(encoding))
+    # clear αντί για drop_tree: το tail μένει ξεχωριστός κόμβος κειμένου (όπως στο iter_index_nodes),
+    # αλλιώς κολλάει στο προηγούμενο κείμενο χωρίς κενό ('2109549400Email: ...')
+    for el in list(tree.iter("script", "style")):
+        el.clear(keep_tail=True)
+    return tree
+
+
+def text_of(el: HtmlElement) -> str:
+    """Κείμενο όλων των απογόνων, strip ανά κόμβο και ενωμένο με κενό (όπως get_text(" ", strip=True))."""
+    return " ".join(t for t in (s.strip() for s in el.itertext()) if t)
+
+
+def string_of(el: HtmlElement) -> Optional[str]:
+    """Το κείμενο του στοιχείου μόνο αν έχει ένα και μοναδικό παιδί-κείμενο (όπως το `.string` του bs4)."""
+    if len(el) == 0:
+        return el.text
+    if len(el) == 1 and not el.text and not el[0].tail:
+        return string_of(el[0])
+    return None
+
+# Μέγιστες ταυτόχρονες λήψεις σελίδων λεπτομερειών
+DETAIL_CONCURRENCY = 10
+
+
+def section_texts(header: HtmlElement, stop_tags: frozenset, collect_tags: frozenset) -> Iterator[str]:
+    """
+    Κείμενα (collapse_ws, μη κενά) των επόμενων αδελφών του header με tag στο `collect_tags`,
+    μέχρι το πρώτο αδελφό με tag στο `stop_tags` (π.χ. τον επόμενο τίτλο).
+    """
+    for sib in header.itersiblings():
+        tag = sib.tag
+        if tag in stop_tags:
+            break
+        if tag in collect_tags:
+            text = collapse_ws(text_of(sib))
+            if text:
+                yield text
+
+
+def iter_index_nodes(content: bytes, encoding: str, tags: Tuple[str, ...]) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """
+    Streaming parsing (lxml iterparse) μεγάλων σελίδων-ευρετηρίων: δίνει (tag, κείμενο, href)
+    για κάθε στοιχείο με tag στο `tags`, με τη σειρά εμφάνισης στο έγγραφο.
+    Τα υποδέντρα που έχουν επεξεργαστεί αδειάζουν, ώστε η μνήμη να μη μεγαλώνει με τη σελίδα.
+    """
+    wanted = set(tags)
+    pending: List[Optional[Tuple[str, str, Optional[str]]]] = []
+    open_idx: List[int] = []
+    for event, el in etree.iterparse(io.BytesIO(content), events=("start", "end"), html=True, encoding=encoding):
+        if event == "start":
+            if el.tag in wanted:
+                open_idx.append(len(pending))
+                pending.append(None)
+            continue
+
+        if el.tag in ("script", "style"):
+            # οπως στο fetch_soup: μονο ορατο κειμενο (το tail ανηκει στον γονεα)
+            el.clear(keep_tail=True)
+            continue
+        if el.tag in wanted:
+            # το υποδεντρο ειναι ακομα ακεραιο, αρα το κειμενο ειναι ιδιο με του text_of()
+            pending[open_idx.pop()] = (el.tag, text_of(el), el.get("href"))
+        if open_idx:
+            # μεσα σε ανοιχτο στοιχειο: το κειμενο του χρειαζεται ακομα
+            continue
+
+        yield from pending
+        pending.clear()
+        el.clear(keep_tail=True)
+        parent = el.getparent()
+        while parent is not None and el.getprevious() is not None:
+            del parent[0]
+
+
+async def fetch_soups(
+    client: httpx.AsyncClient, urls: List[Optional[str]]
+) -> List[Optional[HtmlElement] | BaseException]:
+    """
+    Παράλληλη λήψη πολλών σελίδων (έως DETAIL_CONCURRENCY ταυτόχρονα), με τη σειρά των `urls`.
+    Για url None επιστρέφει None, για αποτυχημένη λήψη το αντίστοιχο exception.
+    Κάθε διαφορετικό url κατεβαίνει μία φορά, οι διπλότυπες θέσεις μοιράζονται το ίδιο δέντρο.
+    """
+    sem = asyncio.Semaphore(DETAIL_CONCURRENCY)
+
+    async def one(url: str) -> HtmlElement:
+        async with sem:
+            return await fetch_soup(client, url)
+
+    unique = list(dict.fromkeys(u for u in urls if u))
+    results = await asyncio.gather(*(one(u) for u in unique), return_exceptions=True)
+    by_url = dict(zip(unique, results))
+    return [by_url[u] if u else None for u in urls]
+
 
 def safe_int(x: Optional[str]) -> Optional[int]:
     """Ασφαλής μετατροπή σε int (None σε αποτυχία)."""
@@ -74,21 +253,33 @@ def norm_code(code: str | None) -> str | None:
 
 
 def deobfuscate_email(token: str | None) -> Optional[str]:
-    """Μετατροπή 'it[at]hua[dot]gr' σε κανοικη διεύθυνση 'it@hua.gr'."""
+    """
+    Μετατροπή 'it[at]hua[dot]gr' σε κανοικη διεύθυνση 'it@hua.gr'.
+    Το case του token διατηρείται: το email των καθηγητών είναι PRIMARY KEY
+    και τυχόν lowercase γίνεται από τον caller (π.χ. extract_emails_from_soup).
+    """
     if not token:
         return None
-    result = token
-    result = re.sub(r"\s*\[at\]\s*", "@", result, flags=re.I)
-    result = re.sub(r"\s*\(at\)\s*", "@", result, flags=re.I)
-    result = re.sub(r"\s*\[dot\]\s*", ".", result, flags=re.I)
-    result = re.sub(r"\s*\(dot\)\s*", ".", result, flags=re.I)
-    return result.strip()
+    result = _EMAIL_OBFUSCATION_RE.sub(
+        lambda m: "@" if (m.group(1) or m.group(2)).lower() == "at" else ".", token
+    )
+    # κενά γύρω από @ και . (π.χ. 'it [at] hua [dot] gr')
+    return _EMAIL_SPACES_RE.sub(r"\1", result).strip()
+
+
+def first_phone(text: str) -> Optional[str]:
+    """Πρώτο τηλέφωνο του κειμένου (ή None). Κείμενα χωρίς ψηφία δεν περνούν καν από το regex."""
+    if _DIGITS.isdisjoint(text):
+        return None
+    m = _PHONE_RE.search(text)
+    return m.group(0) if m else None
 
 
+@lru_cache(maxsize=4096)
 def slugify(text: str) -> str:
     """Δημιουργεί «κλειδί» (slug) μόνο με αλφαριθμητικούς/underscore."""
-    text_norm = re.sub(r"[^\w]+", "_", collapse_ws(text))
-    return re.sub(r"_+", "_", text_norm).strip("_").lower()
+    text_norm = _SLUG_RE.sub("_", collapse_ws(text))
+    return _UNDERSCORES_RE.sub("_", text_norm).strip("_").lower()
 
 
 # Βοηθήματα Βάσης Δεδομένων
@@ -120,180 +311,284 @@ def ensure_extra_tables(con: sqlite3.Connection) -> None:
     con.executescript(SCHEMA_EXTRA)
     con.commit()
 
-def upsert_professor(cur: sqlite3.Cursor, row: Dict[str, Optional[str]]) -> None:
+
+# Τα upsert_* δεν γράφουν απευθείας: μαζεύουν tuples σε λίστα ανά πίνακα και τα
+# αντίστοιχα flush_* τα γράφουν μέσω _flush_rows. Η πρώτη στήλη είναι πάντα το PRIMARY KEY.
+
+def _flush_rows(cur: sqlite3.Cursor, table: str, columns: Tuple[str, ...], rows: List[tuple]) -> None:
+    """
+    Upsert με σημασιολογία COALESCE (οι None τιμές δεν σβήνουν υπάρχουσες), χωρίς ON CONFLICT ανά γραμμή:
+    - γραμμές με ίδιο κλειδί συγχωνεύονται πρώτα στην Python (η τελευταία μη-None τιμή κερδίζει)
+    - τα νέα κλειδιά γράφονται με ένα INSERT OR IGNORE executemany
+    - τα υπάρχοντα γίνονται UPDATE μόνο στις στήλες με τιμή (ένα executemany ανά σύνολο στηλών)
+      και μόνο αν κάποια από αυτές αλλάζει
+    """
+    if not rows:
+        return
+    pk = columns[0]
+    merged: Dict[object, list] = {}
+    keyless: List[tuple] = []
+    for row in rows:
+        if row[0] is None:
+            keyless.append(row)
+            continue
+        prev = merged.get(row[0])
+        if prev is None:
+            merged[row[0]] = list(row)
+        else:
+            for i, v in enumerate(row):
+                if v is not None:
+                    prev[i] = v
+
+    existing = {r[0] for r in cur.execute(f"SELECT {pk} FROM {table}")}
+    placeholders = ",".join("?" * len(columns))
+    new_rows = [tuple(v) for k, v in merged.items() if k not in existing]
+    new_rows.extend(keyless)
+    cur.executemany(
+        f"INSERT OR IGNORE INTO {table}({', '.join(columns)}) VALUES({placeholders})", new_rows
+    )
+
+    updates: Dict[Tuple[int, ...], List[tuple]] = {}
+    for k, v in merged.items():
+        if k not in existing:
+            continue
+        idx = tuple(i for i in range(1, len(columns)) if v[i] is not None)
+        if idx:
+            values = tuple(v[i] for i in idx)
+            updates.setdefault(idx, []).append(values + (k,) + values)
+    for idx, params in updates.items():
+        sets = ", ".join(f"{columns[i]}=?" for i in idx)
+        # μόνο αν αλλάζει κάτι: αλλιώς η γραμμή δεν αγγίζεται (ούτε τρέχουν τα AFTER UPDATE triggers του FTS)
+        changed = " OR ".join(f"{columns[i]} IS NOT ?" for i in idx)
+        cur.executemany(f"UPDATE {table} SET {sets} WHERE {pk}=? AND ({changed})", params)
+    rows.clear()
+
+
+PROFESSOR_COLUMNS = (
+    "email",
+    "f_name",
+    "l_name",
+    "gender",
+    "office",
+    "phone",
+    "category",
+    "area_of",
+    "academic_web_page",
+    "image_url",
+)
+_prof_rows: List[tuple] = []
+
+def upsert_professor(row: Dict[str, Optional[str]]) -> None:
     """
     Εισαγωγή/ενημέρωση καθηγητή (PRIMARY KEY: email).
     Αν λείπει email, προηγείται σύνθεση 'firstname.lastname@unknown' και αργότερα
     επικαιροποιείται όταν βρεθεί πραγματικό email.
     """
-    cur.execute(
-        """
-        INSERT INTO professors(email, f_name, l_name, gender, office, phone, category,
-                               area_of, academic_web_page, image_url)
-        VALUES(?,?,?,?,?,?,?,?,?,?)
-        ON CONFLICT(email) DO UPDATE SET
-          f_name=COALESCE(excluded.f_name, professors.f_name),
-          l_name=COALESCE(excluded.l_name, professors.l_name),
-          gender=COALESCE(excluded.gender, professors.gender),
-          office=COALESCE(excluded.office, professors.office),
-          phone=COALESCE(excluded.phone, professors.phone),
-          category=COALESCE(excluded.category, professors.category),
-          area_of=COALESCE(excluded.area_of, professors.area_of),
-          academic_web_page=COALESCE(excluded.academic_web_page, professors.academic_web_page),
-          image_url=COALESCE(excluded.image_url, professors.image_url)
-        """,
-        (
-            row.get("email"),
-            row.get("f_name"),
-            row.get("l_name"),
-            row.get("gender"),
-            row.get("office"),
-            row.get("phone"),
-            row.get("category"),
-            row.get("area_of"),
-            row.get("page"),
-            row.get("image"),
-        ),
-    )
+    _prof_rows.append((
+        row.get("email"),
+        row.get("f_name"),
+        row.get("l_name"),
+        row.get("gender"),
+        row.get("office"),
+        row.get("phone"),
+        row.get("category"),
+        row.get("area_of"),
+        row.get("page"),
+        row.get("image"),
+    ))
+
+
+def flush_professors(cur: sqlite3.Cursor) -> None:
+    """Γράφει με ένα executemany όλα τα εκκρεμή upserts καθηγητών και αδειάζει τη λίστα."""
+    _flush_rows(cur, "professors", PROFESSOR_COLUMNS, _prof_rows)
+
+
+COURSE_COLUMNS = (
+    "course_code",
+    "course_name",
+    "ects_points",
+    "type",
+    "professor_1",
+    "professor_2",
+    "semester_1",
+    "semester_2",
+    "url",
+)
+_course_rows: List[tuple] = []
+
+def upsert_course(row: Dict[str, Optional[str]]) -> None:
+    """Upsert μαθήματος. Τα περισσότερα πεδία ίσως είναι ακόμη NULL από scraping."""
+    _course_rows.append((
+        row.get("code"),
+        row.get("name"),
+        row.get("ects"),
+        row.get("type"),
+        row.get("prof1"),
+        row.get("prof2"),
+        row.get("sem1"),
+        row.get("sem2"),
+        row.get("url"),
+    ))
+
+
+def flush_courses(cur: sqlite3.Cursor) -> None:
+    """Γράφει με ένα executemany όλα τα εκκρεμή upserts μαθημάτων και αδειάζει τη λίστα."""
+    _flush_rows(cur, "courses", COURSE_COLUMNS, _course_rows)
+
+
+FACILITY_COLUMNS = (
+    "name",
+    "email",
+    "phone",
+    "fax",
+    "location",
+    "working_hours",
+    "url",
+)
+_facility_rows: List[tuple] = []
+
+def upsert_facility(row: Dict[str, Optional[str]]) -> None:
+    """Upsert facility/υπηρεσίας (facilities)."""
+    _facility_rows.append((
+        row.get("name"),
+        row.get("email"),
+        row.get("phone"),
+        row.get("fax"),
+        row.get("location"),
+        row.get("hours"),
+        row.get("url"),
+    ))
+
+
+def flush_facilities(cur: sqlite3.Cursor) -> None:
+    """Γράφει με ένα executemany όλα τα εκκρεμή upserts δομών (facilities) και αδειάζει τη λίστα."""
+    _flush_rows(cur, "facilities", FACILITY_COLUMNS, _facility_rows)
+
+
+STUDENT_SERVICE_COLUMNS = (
+    "name",
+    "description",
+    "email",
+    "phone",
+    "url",
+)
+_student_service_rows: List[tuple] = []
+
+def upsert_student_service(row: Dict[str, Optional[str]]) -> None:
+    """Upsert εγγραφής στις (γενικές) φοιτητικές υπηρεσίες."""
+    _student_service_rows.append((
+        row.get("name"),
+        row.get("description"),
+        row.get("email"),
+        row.get("phone"),
+        row.get("url"),
+    ))
 
 
-def upsert_course(cur: sqlite3.Cursor, row: Dict[str, Optional[str]]) -> None:
-    """Upsert μαθήματος. Τα περισσότερα πεδία ίσως είναι ακόμη NULL από scraping."""
-    cur.execute(
-        """
-        INSERT INTO courses(course_code, course_name, ects_points, type,
-                            professor_1, professor_2, semester_1, semester_2, url)
-        VALUES(?,?,?,?,?,?,?,?,?)
-        ON CONFLICT(course_code) DO UPDATE SET
-          course_name=COALESCE(excluded.course_name, courses.course_name),
-          ects_points=COALESCE(excluded.ects_points, courses.ects_points),
-          type=COALESCE(excluded.type, courses.type),
-          professor_1=COALESCE(excluded.professor_1, courses.professor_1),
-          professor_2=COALESCE(excluded.professor_2, courses.professor_2),
-          semester_1=COALESCE(excluded.semester_1, courses.semester_1),
-          semester_2=COALESCE(excluded.semester_2, courses.semester_2),
-          url=COALESCE(excluded.url, courses.url)
-        """,
-        (
-            row.get("code"),
-            row.get("name"),
-            row.get("ects"),
-            row.get("type"),
-            row.get("prof1"),
-            row.get("prof2"),
-            row.get("sem1"),
-            row.get("sem2"),
-            row.get("url"),
-        ),
-    )
+def flush_student_services(cur: sqlite3.Cursor) -> None:
+    """Γράφει με ένα executemany όλα τα εκκρεμή upserts φοιτητικών υπηρεσιών και αδειάζει τη λίστα."""
+    _flush_rows(cur, "student_services", STUDENT_SERVICE_COLUMNS, _student_service_rows)
 
 
-def upsert_facility(cur: sqlite3.Cursor, row: Dict[str, Optional[str]]) -> None:
-    """Upsert facility/υπηρεσίας (facilities)."""
-    cur.execute(
-        """
-        INSERT INTO facilities(name, email, phone, fax, location, working_hours, url)
-        VALUES(?,?,?,?,?,?,?)
-        ON CONFLICT(name) DO UPDATE SET
-          email=COALESCE(excluded.email, facilities.email),
-          phone=COALESCE(excluded.phone, facilities.phone),
-          fax=COALESCE(excluded.fax, facilities.fax),
-          location=COALESCE(excluded.location, facilities.location),
-          working_hours=COALESCE(excluded.working_hours, facilities.working_hours),
-          url=COALESCE(excluded.url, facilities.url)
-        """,
-        (
-            row.get("name"),
-            row.get("email"),
-            row.get("phone"),
-            row.get("fax"),
-            row.get("location"),
-            row.get("hours"),
-            row.get("url"),
-        ),
-    )
+EPLATFORM_COLUMNS = (
+    "name",
+    "description",
+    "url",
+    "help_url",
+)
+_eplatform_rows: List[tuple] = []
 
+def upsert_eplatform(row: Dict[str, Optional[str]]) -> None:
+    """Upsert ηλεκτρονικής πλατφόρμας (όνομα/περιγραφή/url/help_url)."""
+    _eplatform_rows.append((
+        row.get("name"),
+        row.get("description"),
+        row.get("url"),
+        row.get("help_url"),
+    ))
 
-def upsert_student_service(cur: sqlite3.Cursor, row: Dict[str, Optional[str]]) -> None:
-    """Upsert εγγραφής στις (γενικές) φοιτητικές υπηρεσίες."""
-    cur.execute(
-        """
-        INSERT INTO student_services(name, description, email, phone, url)
-        VALUES(?,?,?,?,?)
-        ON CONFLICT(name) DO UPDATE SET
-          description=COALESCE(excluded.description, student_services.description),
-          email=COALESCE(excluded.email, student_services.email),
-          phone=COALESCE(excluded.phone, student_services.phone),
-          url=COALESCE(excluded.url, student_services.url)
-        """,
-        (
-            row.get("name"),
-            row.get("description"),
-            row.get("email"),
-            row.get("phone"),
-            row.get("url"),
-        ),
-    )
 
+def flush_eplatforms(cur: sqlite3.Cursor) -> None:
+    """Γράφει με ένα executemany όλα τα εκκρεμή upserts ηλεκτρονικών πλατφορμών και αδειάζει τη λίστα."""
+    _flush_rows(cur, "e_platforms", EPLATFORM_COLUMNS, _eplatform_rows)
 
-def upsert_eplatform(cur: sqlite3.Cursor, row: Dict[str, Optional[str]]) -> None:
-    """Upsert ηλεκτρονικής πλατφόρμας (όνομα/περιγραφή/url/help_url)."""
-    cur.execute(
-        """
-        INSERT INTO e_platforms(name, description, url, help_url)
-        VALUES(?,?,?,?)
-        ON CONFLICT(name) DO UPDATE SET
-          description=COALESCE(excluded.description, e_platforms.description),
-          url=COALESCE(excluded.url, e_platforms.url),
-          help_url=COALESCE(excluded.help_url, e_platforms.help_url)
-        """,
-        (
-            row.get("name"),
-            row.get("description"),
-            row.get("url"),
-            row.get("help_url"),
-        ),
-    )
 
+CONTACT_COLUMNS = (
+    "key",
+    "label",
+    "value",
+    "url",
+)
+_contact_rows: List[tuple] = []
 
-def upsert_contact(cur: sqlite3.Cursor, row: Dict[str, Optional[str]]) -> None:
+def upsert_contact(row: Dict[str, Optional[str]]) -> None:
     """Upsert επαφής/κλειδιού επικοινωνίας (key/label/value/url)."""
-    cur.execute(
-        """
-        INSERT INTO contacts(key, label, value, url)
-        VALUES(?,?,?,?)
-        ON CONFLICT(key) DO UPDATE SET
-          label=COALESCE(excluded.label, contacts.label),
-          value=COALESCE(excluded.value, contacts.value),
-          url=COALESCE(excluded.url, contacts.url)
-        """,
-        (
-            row.get("key"),
-            row.get("label"),
-            row.get("value"),
-            row.get("url"),
-        ),
-    )
+    _contact_rows.append((
+        row.get("key"),
+        row.get("label"),
+        row.get("value"),
+        row.get("url"),
+    ))
+
+
+def flush_contacts(cur: sqlite3.Cursor) -> None:
+    """Γράφει με ένα executemany όλα τα εκκρεμή upserts επαφών και αδειάζει τη λίστα."""
+    _flush_rows(cur, "contacts", CONTACT_COLUMNS, _contact_rows)
 
 # SCRAPERS
 
-def scrape_professors(client: httpx.Client, cur: sqlite3.Cursor) -> int:
+def _apply_professor_details(prof: Dict[str, Optional[str]], ds: HtmlElement) -> None:
+    """Συμπληρώνει τα πεδία του `prof` που λείπουν από τη σελίδα λεπτομερειών `ds`."""
+    full_txt = collapse_ws(text_of(ds))
+
+    # 'Label: Value' σε p/li/div: ένα πέρασμα του δέντρου για όλες τις ετικέτες που λείπουν,
+    # με fallback στο όλο κείμενο
+    wanted = {k: pat for k, pat in (("office", _OFFICE_LABEL_RE), ("area_of", _AREA_LABEL_RE)) if prof[k] is None}
+    if wanted:
+        for key, value in scan_labels(ds, wanted, ("p", "li", "div")).items():
+            if value is None:
+                m_full = wanted[key].search(full_txt)
+                value = collapse_ws(m_full.group(1)) if m_full else None
+            prof[key] = value
+
+    if prof["email"] is None:
+        m_de = EMAIL_RE.search(full_txt)
+        if m_de:
+            prof["email"] = deobfuscate_email(m_de.group(0))
+    if prof["phone"] is None:
+        prof["phone"] = first_phone(full_txt)
+    if prof["page"] is None:
+        a_page = next(
+            (a for a in ds.iterdescendants("a")
+             if a.get("href") is not None and _SITE_LINK_RE.search(string_of(a) or "")),
+            None,
+        )
+        if a_page is not None:
+            prof["page"] = absolutize(a_page.get("href"))
+        else:
+            ext = next((a for a in ds.iterdescendants("a") if _HTTP_RE.search(a.get("href") or "")), None)
+            prof["page"] = ext.get("href") if ext is not None else None
+
+
+async def scrape_professors(client: httpx.AsyncClient, cur: sqlite3.Cursor) -> int:
     """
     Scrape καθηγητών από τη σελίδα μελών ΔΕΠ.
     Προσπαθεί πρώτα από την βασική σελίδα και (αν λείπουν πεδία) ανοίγει τη σελίδα λεπτομερειών.
     Επιστρέφει πλήθος upserts.
     """
-    soup = fetch_soup(client, URL_FACULTY)
+    soup = await fetch_soup(client, URL_FACULTY)
     # Τα containers έχουν inline padding ή είναι <article>
-    cards: Iterable[BeautifulSoup] = soup.select("div[style*='padding']") or soup.select("article") or []
+    cards: Iterable[HtmlElement] = _PADDED_DIVS_XPATH(soup) or _ARTICLES_XPATH(soup) or []
 
     count = 0
+    # (prof, full_name, f_name, l_name, detail_url ή None)
+    pending: List[Tuple[Dict[str, Optional[str]], str, str, str, Optional[str]]] = []
     for card in cards:
         # Επικεφαλίδα με πλήρες όνομα και κατηγορία (π.χ. «Μάρα Νικολαΐδου, Καθηγήτρια»)
-        h = card.find(["h2", "h3", "h4"])
-        if not h:
+        h = next(card.iterdescendants("h2", "h3", "h4"), None)
+        if h is None:
             continue
-        heading = collapse_ws(h.get_text(" ", strip=True))
+        heading = collapse_ws(text_of(h))
         if not heading:
             continue
         parts = [p.strip() for p in heading.split(",")]
@@ -319,73 +614,48 @@ def scrape_professors(client: httpx.Client, cur: sqlite3.Cursor) -> int:
         }
 
         # Εικόνα (αν υπάρχει)
-        img_el = card.find("img")
-        if img_el and img_el.has_attr("src"):
-            prof["image"] = absolutize(img_el["src"])
-
-        # Αναζήτηση πληροφοριών σε παραγράφους
-        for p in card.find_all("p"):
-            txt = collapse_ws(p.get_text(" ", strip=True))
-            if not txt:
-                continue
-            # Γνωστικό αντικείμενο
-            if re.search(r"γνωστικ(?:ό|ο) αντικείμενο", txt, flags=re.I):
-                parts_ = re.split(r"[:：]", txt, maxsplit=1)
-                prof["area_of"] = collapse_ws(parts_[1]) if len(parts_) == 2 else None
+        img_el = next(card.iterdescendants("img"), None)
+        if img_el is not None and img_el.get("src") is not None:
+            prof["image"] = absolutize(img_el.get("src"))
+
+        # Αναζήτηση πληροφοριών σε παραγράφους: το κείμενο κάθε <p> υπολογίζεται μία φορά
+        # και φθηνοί έλεγχοι substring (στο lowercase) προηγούνται των regex
+        para_texts = [t for t in (collapse_ws(text_of(p)) for p in card.iterdescendants("p")) if t]
+        for txt in para_texts:
+            low = txt.lower()
+            # Email (obfuscated/λανθασμενο οποτε καλουμε την deobfuscate), το πιο συχνό
+            if "@" in txt or "[at]" in low or "(at)" in low:
+                m_em = EMAIL_RE.search(txt)
+                if m_em:
+                    prof["email"] = deobfuscate_email(m_em.group(0))
             # Γραφείο/Τηλέφωνο
-            if re.search(r"γραφεί(?:ο|ο)", txt, flags=re.I) or re.search(r"τηλ", txt, flags=re.I):
-                m_off = re.search(r"γραφεί(?:ο|ο)\s*[:：]\s*([^,]+)", txt, flags=re.I)
+            if "γραφείο" in low or "τηλ" in low:
+                m_off = _OFFICE_RE.search(txt)
                 if m_off:
                     prof["office"] = collapse_ws(m_off.group(1))
-                phones = re.findall(r"\+?\d[\d\s\-]{6,}\d", txt)
-                if phones:
-                    prof["phone"] = phones[0].strip()
-            # Email (obfuscated/λανθασμενο οποτε καλουμε την deobfuscate)
-            if re.search(r"@|\[at\]|\(at\)", txt, flags=re.I):
-                m_em = re.search(r"[A-Za-z0-9._%+-]+\s*(?:\[at\]|@|\(at\))\s*[A-Za-z0-9.-]+\s*(?:\[dot\]|\.|\(dot\))\s*[A-Za-z]{2,}", txt, flags=re.I)
-                if m_em:
-                    prof["email"] = deobfuscate_email(m_em.group(0))
+                phone = first_phone(txt)
+                if phone:
+                    prof["phone"] = phone.strip()
+            # Γνωστικό αντικείμενο
+            if "γνωστικό αντικείμενο" in low or "γνωστικο αντικείμενο" in low:
+                parts_ = _SEP_RE.split(txt, maxsplit=1)
+                prof["area_of"] = collapse_ws(parts_[1]) if len(parts_) == 2 else None
 
         # Link «Περισσότερες Πληροφορίες»
-        detail_a = card.find("a", string=re.compile("Περισσότερες", re.I))
-        detail_url = absolutize(detail_a["href"]) if detail_a and detail_a.has_attr("href") else None
+        detail_a = next((a for a in card.iterdescendants("a") if _MORE_INFO_RE.search(string_of(a) or "")), None)
+        detail_url = absolutize(detail_a.get("href")) if detail_a is not None else None
 
-        # Αν λείπουν πεδία και υπάρχει link, επιχειρούμε scraping στη σελίδα λεπτομερειών
+        # Αν λείπουν πεδία και υπάρχει link, η σελίδα λεπτομερειών κατεβαίνει παρακάτω (παράλληλα)
         need_detail = any(prof[k] is None for k in ["email", "office", "phone", "area_of", "page"])
-        if need_detail and detail_url:
+        pending.append((prof, full_name, f_name, l_name, detail_url if need_detail else None))
+
+    details = await fetch_soups(client, [item[-1] for item in pending])
+    for (prof, full_name, f_name, l_name, _), ds in zip(pending, details):
+        if ds is not None:
             try:
-                ds = fetch_soup(client, detail_url)
-                full_txt = collapse_ws(ds.get_text(" ", strip=True))
-
-                def find_after(label_regex: str) -> Optional[str]:
-                    # Σκανάρει p/li/div για μοτίβο 'Label: Value'
-                    for el in ds.find_all(["p", "li", "div"]):
-                        text = collapse_ws(el.get_text(" ", strip=True))
-                        m = re.search(label_regex + r"\s*[:：]\s*([^\n]+)", text, flags=re.I)
-                        if m:
-                            return collapse_ws(m.group(1))
-                    # fallback στο όλο κείμενο
-                    m_full = re.search(label_regex + r"\s*[:：]\s*([^\n]+)", full_txt, flags=re.I)
-                    return collapse_ws(m_full.group(1)) if m_full else None
-
-                if prof["email"] is None:
-                    m_de = re.search(r"[A-Za-z0-9._%+-]+\s*(?:\[at\]|@|\(at\))\s*[A-Za-z0-9.-]+\s*(?:\[dot\]|\.|\(dot\))\s*[A-Za-z]{2,}", full_txt)
-                    if m_de:
-                        prof["email"] = deobfuscate_email(m_de.group(0))
-                if prof["office"] is None:
-                    prof["office"] = find_after(r"γραφεί(?:ο|ο)|office")
-                if prof["phone"] is None:
-                    phones = re.findall(r"\+?\d[\d\s\-]{6,}\d", full_txt)
-                    prof["phone"] = phones[0] if phones else None
-                if prof["area_of"] is None:
-                    prof["area_of"] = find_after(r"γνωστικ(?:ό|ο) αντικείμενο|research area|field")
-                if prof["page"] is None:
-                    a_page = ds.find("a", href=True, string=re.compile(r"site|web|home", re.I))
-                    if a_page:
-                        prof["page"] = absolutize(a_page["href"])
-                    else:
-                        ext = ds.find("a", href=re.compile(r"^https?://"))
-                        prof["page"] = ext["href"] if ext else None
+                if isinstance(ds, BaseException):
+                    raise ds
+                _apply_professor_details(prof, ds)
             except Exception as exc:
                 print(f"[warn] details page failed for {full_name}: {exc}")
 
@@ -394,96 +664,117 @@ def scrape_professors(client: httpx.Client, cur: sqlite3.Cursor) -> int:
             synthetic = f"{slugify(f_name)}.{slugify(l_name)}@unknown"
             prof["email"] = synthetic
 
-        upsert_professor(cur, prof)
+        upsert_professor(prof)
         count += 1
 
+    flush_professors(cur)
     return count
 
 
-# Patterns για "CODE - Τίτλος"
-COURSE_PATTERNS = [
-    re.compile(r"^\s*([A-Za-zΑ-Ωα-ωΆΈΉΊΌΎΏΪΫ0-9]{1,12})\s*[-–—]\s*(.{3,})$"),
-    re.compile(r"^\s*([A-Za-zΑ-Ωα-ωΆΈΉΊΌΎΏΪΫ0-9]{1,12})\s*[:：]\s*(.{3,})$"),
-]
+# Pattern για "CODE - Τίτλος" ή "CODE: Τίτλος" (ενα regex με ολους τους διαχωριστες)
+_COURSE_SEPARATORS = "-–—:："
+COURSE_RE = re.compile(r"^\s*([A-Za-zΑ-Ωα-ωΆΈΉΊΌΎΏΪΫ0-9]{1,12})\s*[-–—:：]\s*(.{3,})$")
 
 def extract_code_and_title(text: str) -> Tuple[Optional[str], Optional[str]]:
     """Επιστρέφει (κωδικός, τίτλος) για μοτίβα «MY01 - Υπολογιστικά Μαθηματικά» ή «ΠΛΗ20:...»."""
-    txt = collapse_ws(text)
-    for pat in COURSE_PATTERNS:
-        m = pat.match(txt)
-        if m:
-            return m.group(1).strip(), m.group(2).strip()
+    # φτηνο φιλτρο: χωρις διαχωριστη δεν μπορει να ταιριαξει
+    if not any(c in text for c in _COURSE_SEPARATORS):
+        return None, None
+    m = COURSE_RE.match(collapse_ws(text))
+    if m:
+        return m.group(1).strip(), m.group(2).strip()
     return None, None
 
-EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+\s*(?:\[at\]|@|\(at\))\s*[A-Za-z0-9.-]+\s*(?:\[dot\]|\.|\(dot\))\s*[A-Za-z]{2,}", re.I)
-
-def extract_emails_from_soup(soup: BeautifulSoup) -> List[str]:
+def _raw_emails(soup: HtmlElement) -> Iterator[str]:
     # mailto: links
-    emails = []
-    for a in soup.find_all("a", href=True):
-        href = a["href"].strip()
+    for a in soup.iterdescendants("a"):
+        href = (a.get("href") or "").strip()
         if href.lower().startswith("mailto:"):
-            emails.append(href.split(":", 1)[1].strip())
-
-    #  κειμενο
-    txt = collapse_ws(soup.get_text(" ", strip=True))
-    emails.extend(m.group(0) for m in EMAIL_RE.finditer(txt))
-
-    # normalize και deobfyscate 
-    norm = []
-    seen = set()
-    for e in emails:
+            yield href.split(":", 1)[1].strip()
+
+    #  κειμενο (υπολογιζεται μονο αν δεν βρεθηκαν ηδη δυο @hua.gr)
+    txt = collapse_ws(text_of(soup))
+    for m in EMAIL_RE.finditer(txt):
+        yield m.group(0)
+
+def extract_emails_from_soup(soup: HtmlElement) -> List[str]:
+    # normalize και deobfyscate, με τη σειρα του εγγραφου: εως δυο διαφορετικα @hua.gr
+    # και, αν δεν φτανουν, συμπληρωση απο τα υπολοιπα (το πολυ 2 συνολικα)
+    hua: List[str] = []
+    others: List[str] = []
+    for e in _raw_emails(soup):
         e2 = deobfuscate_email(e).lower()
         # vaidation για μειλ
         if "@" not in e2 or " " in e2 or len(e2) > 100:
             continue
-        if e2 not in seen:
-            seen.add(e2)
-            norm.append(e2)
+        if e2.endswith("@hua.gr"):
+            if e2 not in hua:
+                hua.append(e2)
+                if len(hua) == 2:
+                    break
+        elif len(others) < 2 and e2 not in others:
+            others.append(e2)
     # προτιμηση σε @hua.gr mails
-    norm.sort(key=lambda x: (not x.endswith("@hua.gr"), x))
-    return norm
-
-def find_label_value_like(soup: BeautifulSoup, label_regex: str) -> Optional[str]:
-    # ψαχνουμε για label: value στο p/li/div
-    pat = re.compile(label_regex + r"\s*[:：]\s*([^\n]+)", re.I)
-    for el in soup.find_all(["p", "li", "div", "td"]):
-        t = collapse_ws(el.get_text(" ", strip=True))
-        m = pat.search(t)
-        if m:
-            return collapse_ws(m.group(1))
-    return None
-
+    return (hua + others)[:2]
 
-def scrape_undergrad_courses(client: httpx.Client, cur: sqlite3.Cursor) -> int:
+def scan_labels(
+    soup: HtmlElement,
+    label_patterns: Dict[str, re.Pattern],
+    tags: Tuple[str, ...] = ("p", "li", "div", "td"),
+) -> Dict[str, Optional[str]]:
+    """
+    Ψάχνει για «label: value» στα `tags` (p/li/div/td) με ένα μόνο πέρασμα του δέντρου.
+    Για κάθε κλειδί του `label_patterns` κρατά την τιμή του πρώτου στοιχείου που ταιριάζει
+    (None αν δεν βρεθεί) και σταματά μόλις βρεθούν όλα.
+    """
+    found: Dict[str, Optional[str]] = dict.fromkeys(label_patterns)
+    pending = dict(label_patterns)
+    for el in soup.iterdescendants(*tags):
+        t = collapse_ws(text_of(el))
+        for key, pat in list(pending.items()):
+            m = pat.search(t)
+            if m:
+                found[key] = collapse_ws(m.group(1))
+                del pending[key]
+        if not pending:
+            break
+    return found
+
+
+async def scrape_undergrad_courses(client: httpx.AsyncClient, cur: sqlite3.Cursor) -> int:
     """
     Scrape προπτυχιακών μαθημάτων + εμπλουτισμός από σελίδα μαθήματος.
     - Βρίσκει (code, title, href) από τη συγκεντρωτική σελίδα
     - Ανοίγει το href (αν υπάρχει) και εξάγει ects/type/semesters/emails
     - Γράφει στο professor_1/2 μόνο αν η τιμή μοιάζει με email
     """
-    soup = fetch_soup(client, URL_UNDERGRAD)
+    content, encoding = await fetch_bytes(client, URL_UNDERGRAD)
 
     candidates: List[Tuple[str, str, Optional[str]]] = []
-    for node in soup.find_all(["li", "p", "span", "a"]):
-        text = collapse_ws(node.get_text(" ", strip=True))
+    for tag, text, node_href in iter_index_nodes(content, encoding, ("li", "p", "span", "a")):
+        text = collapse_ws(text)
         if not text or len(text) > 150:
             continue
         code, title = extract_code_and_title(text)
         if code and title:
             href = None
-            if node.name == "a" and node.has_attr("href"):
-                href = absolutize(node["href"])
+            if tag == "a" and node_href is not None:
+                href = absolutize(node_href)
             candidates.append((norm_code(code), title, href))
 
     seen = set()
-    count = 0
-
+    unique: List[Tuple[str, str, Optional[str]]] = []
     for code, title, href in candidates:
         if not code or code in seen:
             continue
         seen.add(code)
+        unique.append((code, title, href))
 
+    # Οι σελίδες μαθημάτων κατεβαίνουν παράλληλα, το parsing/upsert γίνεται με τη σειρά
+    pages = await fetch_soups(client, [href for _, _, href in unique])
+
+    count = 0
+    for (code, title, href), ds in zip(unique, pages):
         ects = None
         ctype = None
         sem1 = None
@@ -492,25 +783,27 @@ def scrape_undergrad_courses(client: httpx.Client, cur: sqlite3.Cursor) -> int:
         prof2 = None
         page_url = href
 
-        if href:
+        if ds is not None:
             try:
-                ds = fetch_soup(client, href)
+                if isinstance(ds, BaseException):
+                    raise ds
+                labels = scan_labels(ds, COURSE_LABELS)
                 # ECTS
-                ects_txt = find_label_value_like(ds, r"ects|πιστωτικ")
+                ects_txt = labels["ects"]
                 if ects_txt:
-                    m_ects = re.search(r"\d{1,2}", ects_txt)
+                    m_ects = _NUM_RE.search(ects_txt)
                     if m_ects:
                         ects = safe_int(m_ects.group(0))
 
                 # τυπος (ΥΠ/ΕΕ/ΕΡΓ κ.λπ.)
-                type_txt = find_label_value_like(ds, r"τύπ|type|κατηγορ")
+                type_txt = labels["type"]
                 if type_txt:
                     ctype = collapse_ws(type_txt.split()[0]) 
 
                 # εξαμηνα
-                sem_txt = find_label_value_like(ds, r"εξάμηνο|semester")
+                sem_txt = labels["sem"]
                 if sem_txt:
-                    nums = re.findall(r"\d{1,2}", sem_txt)
+                    nums = _NUM_RE.findall(sem_txt)
                     if nums:
                         sem1 = safe_int(nums[0])
                         if len(nums) > 1:
@@ -541,37 +834,29 @@ def scrape_undergrad_courses(client: httpx.Client, cur: sqlite3.Cursor) -> int:
         # για ασφαλεια, μονο πληροφοριες που μοιαζουν με mail
         for k in ("prof1", "prof2"):
             v = row[k]
-            if v and not re.match(r"^[^\s@]+@[^\s@]+\.[^\s@]+$", v):
+            if v and not _PLAIN_EMAIL_RE.match(v):
                 row[k] = None
 
-        upsert_course(cur, row)
+        upsert_course(row)
         count += 1
 
+    flush_courses(cur)
     return count
 
 
-def scrape_facilities(client: httpx.Client, cur: sqlite3.Cursor) -> int:
+async def scrape_facilities(client: httpx.AsyncClient, cur: sqlite3.Cursor) -> int:
     """
     Scrape υποδομών: εντοπίζει επικεφαλίδες (h2/h3) και
     συλλέγει περιγραφές από επόμενα siblings.
     """
-    soup = fetch_soup(client, URL_FACILITIES)
+    soup = await fetch_soup(client, URL_FACILITIES)
     count = 0
-    for header in soup.find_all(["h2", "h3"]):
-        name = collapse_ws(header.get_text(" ", strip=True))
+    for header in soup.iterdescendants(*_FACILITY_HEADERS):
+        name = collapse_ws(text_of(header))
         if not name:
             continue
-        description_parts: List[str] = []
-        for sib in header.next_siblings:
-            if getattr(sib, "name", None) in ["h2", "h3"]:
-                break
-            if getattr(sib, "name", None) in ["p", "div", "ul", "li"]:
-                text = collapse_ws(sib.get_text(" ", strip=True))
-                if text:
-                    description_parts.append(text)
-        description = " ".join(description_parts) if description_parts else None
+        description = " ".join(section_texts(header, _FACILITY_HEADERS, _BLOCK_TAGS)) or None
         upsert_facility(
-            cur,
             {
                 "name": name,
                 "email": None,
@@ -583,30 +868,22 @@ def scrape_facilities(client: httpx.Client, cur: sqlite3.Cursor) -> int:
             },
         )
         count += 1
+    flush_facilities(cur)
     return count
 
 
-def scrape_student_services(client: httpx.Client, cur: sqlite3.Cursor) -> int:
+async def scrape_student_services(client: httpx.AsyncClient, cur: sqlite3.Cursor) -> int:
     """
     Scrape σελίδας υπηρεσιών φοιτητών: λίστα με επικεφαλίδες & περιγραφές.
     """
-    soup = fetch_soup(client, URL_STUDENT_SERVICES)
+    soup = await fetch_soup(client, URL_STUDENT_SERVICES)
     count = 0
-    for header in soup.find_all(["h2", "h3", "h4"]):
-        name = collapse_ws(header.get_text(" ", strip=True))
+    for header in soup.iterdescendants(*_SERVICE_HEADERS):
+        name = collapse_ws(text_of(header))
         if not name:
             continue
-        description = None
-        for sib in header.next_siblings:
-            if getattr(sib, "name", None) in ["h2", "h3", "h4"]:
-                break
-            if getattr(sib, "name", None) in ["p", "div", "li", "ul"]:
-                text = collapse_ws(sib.get_text(" ", strip=True))
-                if text:
-                    description = text
-                    break
+        description = next(section_texts(header, _SERVICE_HEADERS, _BLOCK_TAGS), None)
         upsert_student_service(
-            cur,
             {
                 "name": name,
                 "description": description,
@@ -616,40 +893,42 @@ def scrape_student_services(client: httpx.Client, cur: sqlite3.Cursor) -> int:
             },
         )
         count += 1
+    flush_student_services(cur)
     return count
 
 
-def scrape_eplatforms(client: httpx.Client, cur: sqlite3.Cursor) -> int:
+async def scrape_eplatforms(client: httpx.AsyncClient, cur: sqlite3.Cursor) -> int:
     """
     Scrape e-platforms: εντοπίζει rows με strong/b και εξάγει
     όνομα, περιγραφή και συνδέσμους (κύριο URL + help_url αν υπάρχει).
     """
-    soup = fetch_soup(client, URL_EPLATFORMS)
-    rows = soup.find_all("div", class_=re.compile(r"row")) or []
+    soup = await fetch_soup(client, URL_EPLATFORMS)
+    rows = _ROW_DIVS_XPATH(soup)
     count = 0
     for row in rows:
-        strong = row.find(["strong", "b"])
-        if not strong:
+        strong = next(row.iterdescendants("strong", "b"), None)
+        if strong is None:
             continue
-        name = collapse_ws(strong.get_text(" ", strip=True))
+        name = collapse_ws(text_of(strong))
         if not name:
             continue
-        parent_p = strong.find_parent("p")
+        parent_p = next(strong.iterancestors("p"), None)
         description = None
-        if parent_p:
-            full_p = collapse_ws(parent_p.get_text(" ", strip=True))
+        if parent_p is not None:
+            full_p = collapse_ws(text_of(parent_p))
             description = full_p.replace(name, "", 1).lstrip(" :–—-")
         primary_url: Optional[str] = None
         help_url: Optional[str] = None
-        for a in row.find_all("a", href=True):
-            text = collapse_ws(a.get_text(" ", strip=True)).lower()
-            href = absolutize(a["href"])
+        for a in row.iterdescendants("a"):
+            if a.get("href") is None:
+                continue
+            text = collapse_ws(text_of(a)).lower()
+            href = absolutize(a.get("href"))
             if not primary_url:
                 primary_url = href
             if any(k in text for k in ["guide", "help", "οδηγ", "βοήθεια"]):
                 help_url = href
         upsert_eplatform(
-            cur,
             {
                 "name": name,
                 "description": description,
@@ -658,63 +937,51 @@ def scrape_eplatforms(client: httpx.Client, cur: sqlite3.Cursor) -> int:
             },
         )
         count += 1
+    flush_eplatforms(cur)
     return count
 
 
-def scrape_contact_access(client: httpx.Client, cur: sqlite3.Cursor) -> int:
+async def scrape_contact_access(client: httpx.AsyncClient, cur: sqlite3.Cursor) -> int:
     """
     Scrape επαφων: διεύθυνση τμήματος + γραμματείες (τηλ/email).
     Κανονικοποίηση σε (key,label,value,url) με slugified keys.
     """
-    soup = fetch_soup(client, URL_CONTACT)
+    soup = await fetch_soup(client, URL_CONTACT)
     count = 0
     # Διεύθυνση (h3)
-    h3 = soup.find("h3")
-    if h3:
-        addr = None
-        for sib in h3.next_siblings:
-            if getattr(sib, "name", None) == "p":
-                text = collapse_ws(sib.get_text(" ", strip=True))
-                if text:
-                    addr = text
-                    break
+    h3 = next(soup.iterdescendants("h3"), None)
+    if h3 is not None:
+        addr = next(section_texts(h3, frozenset(), frozenset({"p"})), None)
         if addr:
-            upsert_contact(cur, {"key": "address", "label": collapse_ws(h3.get_text(" ", strip=True)), "value": addr, "url": None})
+            upsert_contact({"key": "address", "label": collapse_ws(text_of(h3)), "value": addr, "url": None})
             count += 1
     # Γραμματείες (h4/h5)
-    for h in soup.find_all(["h4", "h5"]):
-        section = collapse_ws(h.get_text(" ", strip=True))
+    for h in soup.iterdescendants(*_CONTACT_HEADERS):
+        section = collapse_ws(text_of(h))
         if not section:
             continue
         slug = slugify(section)
-        details = ""
-        for sib in h.next_siblings:
-            if getattr(sib, "name", None) in ["h4", "h5"]:
-                break
-            if getattr(sib, "name", None) in ["p", "div"]:
-                txt = collapse_ws(sib.get_text(" ", strip=True))
-                if txt:
-                    details += " " + txt
-        details = details.strip()
-        phone_match = re.search(r"\+?\d[\d\s\-]{6,}\d", details)
-        phone = phone_match.group(0).strip() if phone_match else None
-        email_match = re.search(r"[A-Za-z0-9._%+-]+\s*(?:\[at\]|@|\(at\))\s*[A-Za-z0-9.-]+\s*(?:\[dot\]|\.|\(dot\))\s*[A-Za-z]{2,}", details)
+        details = " ".join(section_texts(h, _CONTACT_HEADERS, frozenset({"p", "div"})))
+        phone = first_phone(details)
+        phone = phone.strip() if phone else None
+        email_match = EMAIL_RE.search(details)
         email = deobfuscate_email(email_match.group(0)) if email_match else None
         if phone:
-            upsert_contact(cur, {"key": f"{slug}_phone", "label": section, "value": phone, "url": None})
+            upsert_contact({"key": f"{slug}_phone", "label": section, "value": phone, "url": None})
             count += 1
         if email:
-            upsert_contact(cur, {"key": f"{slug}_email", "label": section, "value": email, "url": None})
+            upsert_contact({"key": f"{slug}_email", "label": section, "value": email, "url": None})
             count += 1
     # Χάρτης (Google/OpenStreetMap)
-    map_a = soup.find("a", href=re.compile(r"(google\.com/maps|openstreetmap|goo\.gl/maps)", re.I))
-    if map_a:
-        upsert_contact(cur, {"key": "map", "label": "Χάρτης", "value": "Τοποθεσία", "url": map_a["href"]})
+    map_a = next((a for a in soup.iterdescendants("a") if _MAP_RE.search(a.get("href") or "")), None)
+    if map_a is not None:
+        upsert_contact({"key": "map", "label": "Χάρτης", "value": "Τοποθεσία", "url": map_a.get("href")})
         count += 1
+    flush_contacts(cur)
     return count
 
 # main()
-def main() -> None:
+async def amain() -> None:
     """
     Οδηγεί όλη τη ροή scraping:
       1) Δημιουργία πινάκων αν λείπουν
@@ -723,55 +990,73 @@ def main() -> None:
     """
     
     con = sqlite3.connect(SQLITE_DB_PATH)
+    # WAL + λιγότερα fsync: τα upserts μένουν στη μνήμη/WAL μέχρι το τελικό commit
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute("PRAGMA temp_store=MEMORY")
+    con.execute("PRAGMA cache_size=-65536")
+    con.execute("PRAGMA mmap_size=268435456")
     cur = con.cursor()
     ensure_extra_tables(con)
+    # Όλα τα upserts σε ένα transaction, ένα commit στο τέλος
+    con.execute("BEGIN IMMEDIATE")
 
     # trust_env=False: αγνοεί system proxies για να μην απαιτεί socksio
-    client = httpx.Client(headers={"User-Agent": "huahelper-scraper/4.0"}, trust_env=False)
+    # HTTP/2: όλες οι σελίδες του dit.hua.gr πολυπλέκονται σε λίγες keep-alive συνδέσεις.
+    # Τα http2/limits ορίζονται στο transport, αφού με custom transport το client τα αγνοεί.
+    network = httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=2,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=30),
+    )
+    # On-disk HTTP cache: σε κάθε run γίνεται conditional GET (ETag/Last-Modified),
+    # οπότε οι αμετάβλητες σελίδες έρχονται ως 304 και διαβάζονται από τον δίσκο.
+    transport = hishel.AsyncCacheTransport(
+        transport=network,
+        storage=hishel.AsyncFileStorage(base_path=Path(HTTP_CACHE_DIR), ttl=HTTP_CACHE_TTL),
+        controller=hishel.Controller(always_revalidate=True, allow_heuristics=True),
+    )
+    client = httpx.AsyncClient(
+        headers={"User-Agent": "huahelper-scraper/4.0"},
+        trust_env=False,
+        transport=transport,
+    )
     try:
-        try:
-            prof_count = scrape_professors(client, cur)
-            print(f"[professors] upsert: {prof_count}")
-        except Exception as e:
-            print(f"[warn] professors: {e}")
-
-        try:
-            course_count = scrape_undergrad_courses(client, cur)
-            print(f"[courses] upsert: {course_count}")
-        except Exception as e:
-            print(f"[warn] courses: {e}")
-
-        try:
-            fac_count = scrape_facilities(client, cur)
-            print(f"[facilities] upsert: {fac_count}")
-        except Exception as e:
-            print(f"[warn] facilities: {e}")
-
-        try:
-            ss_count = scrape_student_services(client, cur)
-            print(f"[student_services] upsert: {ss_count}")
-        except Exception as e:
-            print(f"[warn] student_services: {e}")
-
-        try:
-            ep_count = scrape_eplatforms(client, cur)
-            print(f"[e_platforms] upsert: {ep_count}")
-        except Exception as e:
-            print(f"[warn] e_platforms: {e}")
-
-        try:
-            contact_count = scrape_contact_access(client, cur)
-            print(f"[contacts] upsert: {contact_count}")
-        except Exception as e:
-            print(f"[warn] contacts: {e}")
-
+        # Οι scrapers είναι ανεξάρτητοι (άλλη σελίδα, άλλος πίνακας) και τρέχουν ταυτόχρονα.
+        # Τα flush_* δεν έχουν await, οπότε οι εγγραφές στο κοινό cursor δεν μπλέκονται.
+        scrapers = (
+            ("professors", scrape_professors),
+            ("courses", scrape_undergrad_courses),
+            ("facilities", scrape_facilities),
+            ("student_services", scrape_student_services),
+            ("e_platforms", scrape_eplatforms),
+            ("contacts", scrape_contact_access),
+        )
+        results = await asyncio.gather(
+            *(scrape(client, cur) for _, scrape in scrapers), return_exceptions=True
+        )
+        for (label, _), result in zip(scrapers, results):
+            if isinstance(result, BaseException):
+                print(f"[warn] {label}: {result}")
+            else:
+                print(f"[{label}] upsert: {result}")
+
+        # Ό,τι έμεινε στις λίστες από scraper που διακόπηκε με exception
+        for flush in (flush_professors, flush_courses, flush_facilities,
+                      flush_student_services, flush_eplatforms, flush_contacts):
+            flush(cur)
         con.commit()
     finally:
         cur.close()
         con.close()
-        client.close()
+        await client.aclose()
     print("Ολοκληρώθηκε ο συγχρονισμός όλων των πηγών.")
 
 
+def main() -> None:
+    """Entry point: τρέχει το async scraping σε νέο event loop."""
+    asyncio.run(amain())
+
+
 if __name__ == "__main__":
     main()
@@ -1,31 +1,37 @@
-import os, httpx
+import os, httpx, orjson
 GRAPH_URL = "https://graph.facebook.com/v18.0/me/messages"
 FB_PAGE_TOKEN = os.getenv("FB_PAGE_TOKEN","")
+# Το token μπαίνει στο URL μία φορά (όχι params dict και URL parsing σε κάθε κλήση)
+_GRAPH_MESSAGES_URL = httpx.URL(GRAPH_URL, params={"access_token": FB_PAGE_TOKEN})
+# Οι helpers δέχονται το κοινό AsyncClient της εφαρμογής (βλ. lifespan στο webhook.py),
+# ώστε οι κλήσεις στο Graph API να ξαναχρησιμοποιούν τις keep-alive συνδέσεις
+# (και τα χρονικά όρια ανά φάση του client).
+# Τα payloads σειριοποιούνται με orjson (ταχύτερο από το json του stdlib)
+JSON_HEADERS = {"content-type": "application/json"}
 
-async def send_sender_action(recipient_id: str, action: str):
+async def send_sender_action(client: httpx.AsyncClient, recipient_id: str, action: str):
     if not FB_PAGE_TOKEN:
         return
-    async with httpx.AsyncClient(timeout=15) as client:
-        params = {"access_token": FB_PAGE_TOKEN}
-        payload = {"recipient":{"id":recipient_id},"sender_action":action}
-        await client.post(GRAPH_URL, params=params, json=payload)
+    payload = {"recipient":{"id":recipient_id},"sender_action":action}
+    await client.post(_GRAPH_MESSAGES_URL, content=orjson.dumps(payload), headers=JSON_HEADERS)
 
-async def send_text(recipient_id: str, text: str, quick_replies=None):
+def to_quick_reply(button: dict) -> dict:
+    """Rasa button -> Messenger quick reply (έτοιμο για το payload, ένα dict ανά κουμπί)."""
+    return {"content_type": "text", "title": button.get("title", "Επιλογή"), "payload": button.get("payload", "")}
+
+async def send_text(client: httpx.AsyncClient, recipient_id: str, text: str, quick_replies=None):
+    # quick_replies: ήδη σε μορφή Messenger (βλ. to_quick_reply)
     if not FB_PAGE_TOKEN:
         return
-    async with httpx.AsyncClient(timeout=15) as client:
-        params = {"access_token": FB_PAGE_TOKEN}
-        msg = {"text": text}
-        if quick_replies:
-            msg["quick_replies"] = [{"content_type":"text","title":qr["title"],"payload":qr["payload"]} for qr in quick_replies]
-        payload = {"recipient":{"id":recipient_id},"message":msg}
-        await client.post(GRAPH_URL, params=params, json=payload)
+    msg = {"text": text}
+    if quick_replies:
+        msg["quick_replies"] = quick_replies
+    payload = {"recipient":{"id":recipient_id},"message":msg}
+    await client.post(_GRAPH_MESSAGES_URL, content=orjson.dumps(payload), headers=JSON_HEADERS)
 
-async def send_generic_template(recipient_id: str, elements: list):
+async def send_generic_template(client: httpx.AsyncClient, recipient_id: str, elements: list):
     if not FB_PAGE_TOKEN:
         return
     attachment = {"type":"template","payload":{"template_type":"generic","elements": elements}}
-    async with httpx.AsyncClient(timeout=15) as client:
-        params = {"access_token": FB_PAGE_TOKEN}
-        payload = {"recipient":{"id":recipient_id},"message":{"attachment": attachment}}
-        await client.post(GRAPH_URL, params=params, json=payload)
+    payload = {"recipient":{"id":recipient_id},"message":{"attachment": attachment}}
+    await client.post(_GRAPH_MESSAGES_URL, content=orjson.dumps(payload), headers=JSON_HEADERS)
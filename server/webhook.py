@@ -3,24 +3,76 @@
 # - GET /webhook: επαλήθευση Meta κατά τη ρύθμιση της εφαρμογής
 # -POST /webhook: λήψη εισερχόμενων event (messages/postbacks),εξαγωγή κειμένου, προώθηση στο Rasa REST webhook, και αποστολή απαντήσεων/template στο Messenger.
 # (ολα ειναι βαση του documentation που φίνει η meta)
+#
+# Εκτέλεση (production):
+#   uvicorn server.webhook:app --host 0.0.0.0 --port 8000 --loop uvloop --http httptools \
+#       --limit-concurrency 1000 --backlog 2048
+# Το uvicorn[standard] φέρνει uvloop (event loop σε libuv) και httptools (HTTP parser σε C).
+# Στα Windows δεν υπάρχει uvloop: εκεί αρκεί το default --loop auto / --http auto.
+# Με --workers N κάθε process έχει δική του ουρά και δική του μνήμη για τα διπλότυπα mid.
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse, PlainTextResponse
-import os, httpx
+from fastapi.responses import ORJSONResponse, PlainTextResponse, Response
+import asyncio, hmac, logging, os, httpx, msgspec, orjson, yaml
+from collections import OrderedDict
 from dotenv import load_dotenv
-from .fb import send_sender_action, send_text, send_generic_template
 from fastapi import Query
 
-# Φόρτωση μεταβλητών περιβάλλοντος από .env (π.χ. tokens, endpoints)
+# Φόρτωση μεταβλητών περιβάλλοντος από .env (π.χ. tokens, endpoints).
+# Πριν από το import του .fb, που διαβάζει το FB_PAGE_TOKEN κατά το import.
 load_dotenv()
 
+from .fb import send_sender_action, send_text, send_generic_template, to_quick_reply
+
+logger = logging.getLogger(__name__)
+
 # Token επαλήθευσης που δίνουμε στη Meta κατά το σετάρισμα του webhook
 VERIFY_TOKEN = os.getenv("FB_VERIFY_TOKEN","")
+# σε bytes μία φορά, για σύγκριση σταθερού χρόνου (hmac.compare_digest) χωρίς περιορισμό σε ASCII
+VERIFY_TOKEN_BYTES = VERIFY_TOKEN.encode()
 # REST endpoint του Rasa (τοπικο για την ωρα)
 RASA_REST = os.getenv("RASA_REST_ENDPOINT","http://localhost:5005/webhooks/rest/webhook")
+# URL και headers έτοιμα μία φορά (όχι parsing/κατασκευή σε κάθε κλήση)
+_RASA_URL = httpx.URL(RASA_REST)
+_RASA_HEADERS = {"content-type": "application/json"}
+# Η (σταθερή) απάντηση του POST /webhook, σειριοποιημένη μία φορά
+_OK_BODY = orjson.dumps({"status": "ok"})
+# Worker pool: πόσοι χρήστες εξυπηρετούνται ταυτόχρονα και πόσες εργασίες χωρά η ουρά
+# Κάθε worker έχει δική του ουρά (WEBHOOK_QUEUE_SIZE θέσεις) και κάθε χρήστης αντιστοιχεί πάντα
+# στον ίδιο worker, οπότε τα μηνύματά του φτάνουν στο Rasa ένα-ένα και με τη σειρά.
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS","8"))
+WEBHOOK_QUEUE_SIZE = int(os.getenv("WEBHOOK_QUEUE_SIZE","1000"))
+
+# Χρονικά όρια ανά φάση: νεκρό upstream αποτυγχάνει γρήγορα αντί να κρατά το event 30s
+HTTP_TIMEOUT = httpx.Timeout(connect=2.0, read=10.0, write=5.0, pool=1.0)
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30)
+# Επαναλήψεις μόνο για σφάλματα σύνδεσης (το μήνυμα δεν έφτασε στο Rasa, άρα δεν διπλασιάζεται)
+RASA_RETRIES = 2
+RASA_RETRY_BACKOFF = 0.2
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Ένα κοινό httpx.AsyncClient για όλη τη ζωή της εφαρμογής (Rasa + Graph API):
+    οι διαδοχικές κλήσεις ξαναχρησιμοποιούν τις keep-alive συνδέσεις αντί για νέο TCP/TLS handshake.
+    """
+    app.state.http = httpx.AsyncClient(timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+    # Μία ουρά εργασιών (events ενός χρήστη) ανά worker: τη γεμίζει το webhook, την αδειάζει ο worker
+    app.state.queues = [asyncio.Queue(maxsize=WEBHOOK_QUEUE_SIZE) for _ in range(WEBHOOK_WORKERS)]
+    workers = [asyncio.create_task(worker(q, app.state.http)) for q in app.state.queues]
+    try:
+        yield
+    finally:
+        # graceful shutdown: ολοκληρώνονται πρώτα τα μηνύματα των ουρών
+        await asyncio.gather(*(q.join() for q in app.state.queues))
+        for w in workers:
+            w.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        await app.state.http.aclose()
 
 # Δημιουργία app FastAPI
-app = FastAPI(title="huahelper-webhook")
+app = FastAPI(title="huahelper-webhook", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 @app.get("/webhook")
 async def verify_webhook(
@@ -33,86 +85,308 @@ async def verify_webhook(
     Endpoint επαλήθευσης του webhook (απαιτούμενο από τηνν Meta).
     Επιστρέφουμε το challenge (text/plain) αν το verify token ταιριάζει.
     """
-    if mode == "subscribe" and token == VERIFY_TOKEN and challenge is not None:
+    if (
+        mode == "subscribe"
+        and challenge is not None
+        and token is not None
+        and hmac.compare_digest(token.encode(), VERIFY_TOKEN_BYTES)
+    ):
         #Η Meta εδω περιμένει 200αρι και plain text με το challenge
         return PlainTextResponse(challenge, status_code=200)
     # Αν κατι δεν πάει καλα απορρίπτουμε με 403
     raise HTTPException(status_code=403, detail="Verification failed")
 
-def extract_text(payload: dict) -> str:
+DOMAIN_PATH = os.getenv("RASA_DOMAIN_PATH", os.path.join(os.path.dirname(__file__), "..", "domain.yml"))
+# Intent που στέλνεται στο Rasa για μηνύματα που δεν υποστηρίζουμε (rule: handle unsupported message)
+UNSUPPORTED_INTENT = "/unsupported_message"
+
+def load_utter_text(name: str) -> str | None:
+    """Το κείμενο ενός response του domain.yml (None αν δεν βρεθεί)."""
+    try:
+        with open(DOMAIN_PATH, encoding="utf-8") as f:
+            return yaml.safe_load(f)["responses"][name][0]["text"]
+    except (OSError, yaml.YAMLError, KeyError, IndexError, TypeError):
+        return None
+
+# Η απάντηση του utter_unsupported_message διαβάζεται από το domain.yml (μία πηγή για το κείμενο),
+# ώστε να απαντάμε χωρίς γύρο στο Rasa. Αν λείπει, το μήνυμα πάει στο Rasa ως intent.
+UNSUPPORTED_REPLY = load_utter_text("utter_unsupported_message")
+
+# Σχήμα του webhook της Meta (μόνο τα πεδία που χρησιμοποιούμε, τα υπόλοιπα αγνοούνται).
+# Το msgspec αποκωδικοποιεί το JSON κατευθείαν σε αυτά τα Structs, χωρίς ενδιάμεσα dicts.
+class Message(msgspec.Struct):
+    mid: str | None = None
+    text: str | None = None
+    quick_reply: dict | None = None
+    attachments: list | None = None
+
+class Messaging(msgspec.Struct):
+    sender: dict
+    message: Message | None = None
+    postback: dict | None = None
+
+class Entry(msgspec.Struct):
+    messaging: list[Messaging] = []
+
+class WebhookBody(msgspec.Struct):
+    entry: list[Entry] = []
+
+_body_decoder = msgspec.json.Decoder(WebhookBody)
+
+def extract_text(payload: Messaging) -> str | None:
     """
     Εξαγωγή από το αντικείμενο messaging:
       - Αν υπάρχει message.text -> επιστρέφεται αυτό
       - Αν υπάρχει quick_reply.payload -> επιστρέφεται το payload (intent?)
-      - Αν υπάρχουν attachments -> «unsupported message»
+      - Αν υπάρχουν attachments -> None (μη υποστηριζόμενο)
       - Αν υπάρχει postback.payload -> επιστρέφεται (κουμπιά/template)
-      - σε καθε αλλη περίπτωση «unsupported message»
-    """
-    msg = payload.get("message", {})
-    if isinstance(msg, dict):
-        if msg.get("text"):
-            return msg["text"]
-        qr = msg.get("quick_reply")
-        if qr and qr.get("payload"):
-            return qr["payload"]
-        if msg.get("attachments"):
-            return "unsupported message"
-    postback = payload.get("postback")
+      - σε καθε αλλη περίπτωση None
+    """
+    msg = payload.message
+    if msg is not None:
+        if msg.text:
+            return msg.text
+        if msg.quick_reply and msg.quick_reply.get("payload"):
+            return msg.quick_reply["payload"]
+        if msg.attachments:
+            return None
+    postback = payload.postback
     if postback and postback.get("payload"):
         return postback["payload"]
-    return "unsupported message"
+    return None
 
-async def forward_to_rasa(sender_id: str, text: str):
+async def forward_to_rasa(sender_id: str, text: str, client: httpx.AsyncClient):
     """
-    Αποστολή του μηνύματος στο Rasa REST webhook.
+    Αποστολή του μηνύματος στο Rasa REST webhook μέσω του κοινού client.
     Επιστρέφει τη JSON λίστα απαντήσεων του Rasa (rasa_responses).
-    exception σε αποτυχία HTTP.
+    Σφάλματα σύνδεσης ξαναδοκιμάζονται (exponential backoff), exception σε κάθε άλλη αποτυχία HTTP.
+    """
+    content = orjson.dumps({"sender": sender_id, "message": text})
+    for attempt in range(RASA_RETRIES + 1):
+        try:
+            r = await client.post(_RASA_URL, content=content, headers=_RASA_HEADERS)
+            break
+        except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+            if attempt == RASA_RETRIES:
+                raise
+            await asyncio.sleep(RASA_RETRY_BACKOFF * 2 ** attempt)
+    r.raise_for_status()
+    return orjson.loads(r.content)
+
+# Όρια του Messenger ανά μήνυμα
+MAX_TEXT_LEN = 2000
+MAX_QUICK_REPLIES = 13
+MAX_CAROUSEL_ELEMENTS = 10
+
+def split_text(text: str, limit: int = MAX_TEXT_LEN) -> list[str]:
+    """Κόβει κείμενο σε κομμάτια έως `limit` χαρακτήρες, κατά προτίμηση σε αλλαγή γραμμής."""
+    chunks = []
+    while len(text) > limit:
+        cut = text.rfind("\n", 0, limit + 1)
+        if cut <= 0:
+            cut = limit
+        chunks.append(text[:cut])
+        text = text[cut:].lstrip("\n")
+    chunks.append(text)
+    return chunks
+
+def plan_fb_messages(rasa_responses: list) -> list:
+    """
+    Ομαδοποίηση των απαντήσεων ενός γύρου του Rasa σε όσο το δυνατόν λιγότερα FB μηνύματα:
+      - διαδοχικά text ενώνονται με "\n" σε ένα μήνυμα, έως MAX_TEXT_LEN χαρακτήρες
+        (μεγαλύτερα κείμενα κόβονται σε περισσότερα μηνύματα)
+      - τα buttons (ως quick replies) κολλάνε στο ίδιο μήνυμα κειμένου («Επιλέξτε:» αν δεν υπάρχει κείμενο),
+        έως MAX_QUICK_REPLIES ανά μήνυμα, τα επόμενα πάνε σε νέο μήνυμα
+      - διαδοχικά carousels (custom.facebook) ενώνονται σε ένα generic template
+    Επιστρέφει λίστα από ("text", κείμενο, quick_replies|None) ή ("carousel", elements, None), με τη σειρά.
     """
-    async with httpx.AsyncClient(timeout=30) as client:
-        r = await client.post(RASA_REST, json={"sender": sender_id, "message": text})
-        r.raise_for_status()
-        return r.json()
+    messages: list = []
+    texts: list = []
+    text_len = 0
+    quick_replies: list = []
+    elements: list = []
+
+    def flush_text():
+        nonlocal text_len
+        if texts or quick_replies:
+            messages.append(("text", "\n".join(texts) or "Επιλέξτε:", list(quick_replies) or None))
+            texts.clear()
+            quick_replies.clear()
+            text_len = 0
+
+    def add_text(text):
+        nonlocal text_len
+        for chunk in split_text(text if isinstance(text, str) else str(text)):
+            # +1 για το "\n" που τα ενώνει
+            if texts and text_len + 1 + len(chunk) > MAX_TEXT_LEN:
+                flush_text()
+            text_len += len(chunk) + (1 if texts else 0)
+            texts.append(chunk)
+
+    def add_buttons(buttons):
+        for qr in map(to_quick_reply, buttons):
+            if len(quick_replies) == MAX_QUICK_REPLIES:
+                flush_text()
+            quick_replies.append(qr)
+
+    def flush_carousel():
+        for i in range(0, len(elements), MAX_CAROUSEL_ELEMENTS):
+            messages.append(("carousel", elements[i:i + MAX_CAROUSEL_ELEMENTS], None))
+        elements.clear()
+
+    # Κάθε μήνυμα του REST channel είναι ένα από: text (+buttons), buttons, custom.
+    # Το match διαλέγει τον κλάδο με ένα πέρασμα αντί για διαδοχικούς ελέγχους `in`/isinstance.
+    for r in rasa_responses:
+        match r:
+            case {"text": text, "buttons": list(buttons)}:
+                flush_carousel()
+                add_text(text)
+                # Μετατροπή Rasa buttons σε Messenger quick replies
+                add_buttons(buttons)
+            case {"text": text}:
+                flush_carousel()
+                add_text(text)
+            case {"buttons": list(buttons)}:
+                flush_carousel()
+                add_buttons(buttons)
+            case {"custom": {"facebook": {"type": "carousel"} as fb}}:
+                # Υποστήριξη custom payload τύπου carousel
+                flush_text()
+                elements.extend(fb.get("elements", []))
+    flush_text()
+    flush_carousel()
+    return messages
+
+async def handle_event(m: Messaging, client: httpx.AsyncClient):
+    """
+    Επεξεργασία ενός messaging event:
+      - sender actions (mark_seen, typing_on) παράλληλα με την κλήση στο Rasa
+      - αποστολή των απαντήσεων του Rasa στο Messenger
+    """
+    sender_id = m.sender["id"]
+    text = extract_text(m)
+    if text is None:
+        # Events χωρίς message/postback (read, delivery κ.λπ.) αγνοούνται σιωπηλά.
+        if m.message is None and m.postback is None:
+            return
+        # Για τα υπόλοιπα (attachments, stickers) απαντάμε απευθείας, χωρίς το Rasa
+        if UNSUPPORTED_REPLY is not None:
+            await send_text(client, sender_id, UNSUPPORTED_REPLY)
+            return
+        text = UNSUPPORTED_INTENT
+    # UX στο Messenger: είδε το μήνυμα, πληκτρολογεί… Τα δύο sender actions και η κλήση
+    # στο Rasa τρέχουν ταυτόχρονα (ένα RTT αντί για τρία διαδοχικά)
+    _, _, rasa_responses = await asyncio.gather(
+        send_sender_action(client, sender_id, "mark_seen"),
+        send_sender_action(client, sender_id, "typing_on"),
+        forward_to_rasa(sender_id, text, client),
+        return_exceptions=True,
+    )
+    if isinstance(rasa_responses, httpx.TimeoutException):
+        # παροδικό: το Rasa άργησε ή δεν ήταν διαθέσιμο
+        await send_text(client, sender_id, "Η υπηρεσία αργεί να απαντήσει. Προσπάθησε ξανά σε λίγο.")
+        return
+    if isinstance(rasa_responses, BaseException):
+        # Μήνυμα σφάλματος αντί για «ξερό» HTTP error
+        await send_text(client, sender_id, "Σφάλμα υπηρεσίας. Προσπάθησε ξανά αργότερα.")
+        return
+
+    # Χαρτογράφηση απαντήσεων Rasa σε (λιγότερα) FB μηνύματα
+    for kind, content, quick_replies in plan_fb_messages(rasa_responses):
+        if kind == "text":
+            await send_text(client, sender_id, content, quick_replies=quick_replies)
+        else:
+            await send_generic_template(client, sender_id, content)
+
+async def worker(queue: asyncio.Queue, client: httpx.AsyncClient):
+    """
+    Παίρνει από την ουρά του τα events των χρηστών που του αντιστοιχούν και τα εξυπηρετεί ένα-ένα
+    με τη σειρά τους (ώστε ο tracker του Rasa να βλέπει τη σωστή ροή).
+    Σφάλμα σε ένα event καταγράφεται στο log και δεν σταματά τον worker.
+    """
+    while True:
+        events = await queue.get()
+        try:
+            for m in events:
+                try:
+                    await handle_event(m, client)
+                except Exception:
+                    logger.exception("webhook: αποτυχία επεξεργασίας event του %s", m.sender.get("id"))
+        finally:
+            queue.task_done()
+
+# Τελευταία message ids (mid) που δεχτήκαμε: η Meta κάποιες φορές ξαναστέλνει το ίδιο μήνυμα.
+# Μνήμη ανά process, με όριο (το παλαιότερο φεύγει πρώτο).
+SEEN_MIDS_MAX = 4096
+_seen_mids: OrderedDict = OrderedDict()
+
+def _mid(m: Messaging) -> str | None:
+    return m.message.mid if m.message is not None else None
+
+def remember_mids(jobs: list[list[Messaging]]):
+    """Καταγράφει τα mid των events που μπήκαν στην ουρά."""
+    for events in jobs:
+        for m in events:
+            mid = _mid(m)
+            if mid:
+                _seen_mids[mid] = None
+                _seen_mids.move_to_end(mid)
+    while len(_seen_mids) > SEEN_MIDS_MAX:
+        _seen_mids.popitem(last=False)
+
+def queue_for(queues: list[asyncio.Queue], sender_id) -> asyncio.Queue:
+    """Η ουρά (και άρα ο worker) που εξυπηρετεί πάντα τον συγκεκριμένο χρήστη."""
+    return queues[hash(sender_id) % len(queues)]
+
+def group_by_sender(body: WebhookBody) -> list[list[Messaging]]:
+    """
+    Τα entry/messaging events ενός POST της Meta, ομαδοποιημένα ανά αποστολέα.
+    Παραλείπονται μηνύματα με mid που έχει ήδη παραληφθεί (ή εμφανίζεται δεύτερη φορά στο ίδιο POST).
+    """
+    by_sender: dict = {}
+    batch_mids: set = set()
+    for e in body.entry:
+        for m in e.messaging:
+            mid = _mid(m)
+            if mid:
+                if mid in _seen_mids or mid in batch_mids:
+                    continue
+                batch_mids.add(mid)
+            by_sender.setdefault(m.sender.get("id"), []).append(m)
+    return list(by_sender.values())
 
 @app.post("/webhook")
 async def webhook(req: Request):
     """
     Κύριο endpoint:
+      - Απαντά αμέσως 200 στη Meta και η επεξεργασία γίνεται στο παρασκήνιο από τους workers,
+        ώστε αργό Rasa να μην προκαλεί retries από τη Meta (503 αν η ουρά είναι γεμάτη)
       - Τσεκαρει κάθε entry/messaging event
-      - Στέλνει sender actions (mark_seen, typing_on) #να θυμηθω να τα ενεργοποιησω στο dash
-      - Εξάγει κείμενο με extract_text
-      - Καλεί Rasa
-      - Για κάθε απαντηση του Rasa:
-          - text -> send_text
-          - buttons (quick replies) -> send_text με quick_replies
-          - custom.facebook τύπου "carousel" -> send_generic_template
-    """
-    body = await req.json()
-    for e in body.get("entry", []):
-        for m in e.get("messaging", []):
-            sender_id = m["sender"]["id"]
-            # UX στο Messenger: είδε το μήνυμα, πληκτρολογεί…
-            await send_sender_action(sender_id, "mark_seen")
-            await send_sender_action(sender_id, "typing_on")
-
-            text = extract_text(m)
-            try:
-                rasa_responses = await forward_to_rasa(sender_id, text)
-            except Exception:
-                # Μήνυμα σφάλματος αντί για «ξερό» HTTP error
-                await send_text(sender_id, "Σφάλμα υπηρεσίας. Προσπάθησε ξανά αργότερα.")
-                continue
-
-            # Χαρτογράφηση απαντήσεων Rasa σε FB μηνύματα
-            for r in rasa_responses:
-                if "text" in r:
-                    await send_text(sender_id, r["text"])
-                if "buttons" in r and isinstance(r["buttons"], list):
-                    # Μετατροπή Rasa buttons σε Messenger quick replies
-                    qrs = [{"title": b.get("title","Επιλογή"), "payload": b.get("payload","")} for b in r["buttons"]]
-                    await send_text(sender_id, r.get("text","Επιλέξτε:"), quick_replies=qrs)
-                if "custom" in r and isinstance(r["custom"], dict):
-                    fb = r["custom"].get("facebook")
-                    # Υποστήριξη custom payload τύπου carousel
-                    if isinstance(fb, dict) and fb.get("type") == "carousel":
-                        await send_generic_template(sender_id, fb.get("elements", []))
-    return JSONResponse({"status":"ok"})
\ No newline at end of file
+      - Ομαδοποιεί τα events ανά αποστολέα: διαφορετικοί χρήστες εξυπηρετούνται παράλληλα
+        (έως WEBHOOK_WORKERS), του ίδιου χρήστη πάντα από τον ίδιο worker και με τη σειρά
+      - Για κάθε event (handle_event):
+          - sender actions (mark_seen, typing_on) #να θυμηθω να τα ενεργοποιησω στο dash
+          - εξάγει κείμενο με extract_text και καλεί Rasa
+          - για κάθε απαντηση του Rasa:
+              - text -> send_text
+              - buttons (quick replies) -> send_text με quick_replies
+              - custom.facebook τύπου "carousel" -> send_generic_template
+    """
+    # msgspec: JSON -> WebhookBody σε ένα πέρασμα (αντί για req.json() και dicts)
+    try:
+        body = _body_decoder.decode(await req.body())
+    except msgspec.DecodeError:
+        raise HTTPException(status_code=400, detail="Invalid webhook payload")
+    queues: list[asyncio.Queue] = req.app.state.queues
+    jobs = group_by_sender(body)
+    targets = [queue_for(queues, events[0].sender.get("id")) for events in jobs]
+    # ή μπαίνουν όλες οι εργασίες του POST ή καμία (η Meta θα το ξαναστείλει ολόκληρο)
+    for q in set(targets):
+        if q.maxsize and q.maxsize - q.qsize() < targets.count(q):
+            raise HTTPException(status_code=503, detail="Webhook queue full")
+    for q, events in zip(targets, jobs):
+        q.put_nowait(events)
+    # μόνο μετά την επιτυχή εισαγωγή: αν δόθηκε 503, η επανάληψη της Meta δεν πρέπει να θεωρηθεί διπλότυπη
+    remember_mids(jobs)
+    # νέο Response κάθε φορά (τα headers του μπορεί να τα πειράξει κάποιο middleware), χωρίς serialization
+    return Response(content=_OK_BODY, media_type="application/json")